@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Knowledge Graph Benchmarks
+
+    python bench_knowledge_graph.py query [--edges 100000] [--repeat 200] [--output FILE]
+    python bench_knowledge_graph.py analytics [--edges 300000] [--output FILE]
+    python bench_knowledge_graph.py startup [--repeat 10] [--output FILE]
+    python bench_knowledge_graph.py build [--docs 500] [--terms 2000] [--words 2000]
+                                          [--zipf 1.1] [--workers 1] [--output FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import bisect
+import resource
+import tempfile
+from itertools import accumulate
+import argparse
+import threading
+import statistics
+import subprocess
+import multiprocessing
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time_ms(fn: Callable, repeat: int) -> Dict[str, float]:
+    """Median / p95 / max wall time of fn() in milliseconds"""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def synthetic_graph(edges: int, seed: int = 7):
+    """
+    Builder populated with a random concept/document graph of roughly `edges`
+    relationships: 60% extracted_from (via build_concept_nodes), 40% related_to.
+    """
+    from build_knowledge_graph import KnowledgeGraphBuilder, Node, Relationship
+
+    rng = random.Random(seed)
+    builder = KnowledgeGraphBuilder(tempfile.mkdtemp(prefix="kg-bench-"), use_parse_cache=False)
+    n_concepts = max(10, edges // 20)
+    per_doc = 20
+    n_docs = max(1, int(edges * 0.6) // per_doc)
+
+    names = [f"concept {i}" for i in range(n_concepts)]
+    for d in range(n_docs):
+        doc_id = builder.generate_id("document", f"doc{d}")
+        builder.add_node(Node(id=doc_id, type="document", data={"title": f"doc{d}"}))
+        # Skewed popularity so posting lists have realistic length spread
+        picked = {names[min(n_concepts - 1, int(rng.paretovariate(1.2)) - 1)] for _ in range(per_doc // 2)}
+        picked.update(rng.sample(names, per_doc - len(picked)))
+        for node in builder.build_concept_nodes(sorted(picked), doc_id):
+            builder.add_node(node)
+
+    concept_ids = [builder.generate_id("concept", name) for name in names]
+    for _ in range(edges - len(builder.relationships)):
+        a, b = rng.sample(concept_ids, 2)
+        builder.add_relationship(Relationship(from_id=a, to_id=b, rel_type="related_to",
+                                              strength=rng.uniform(0.1, 1.0), bidirectional=True))
+    return builder, names, concept_ids
+
+
+def synthetic_corpus(directory: str, docs: int, terms: int, words_per_doc: int = 2000,
+                     zipf_s: float = 1.1, term_rate: float = 0.05, seed: int = 7) -> str:
+    """
+    Write `docs` markdown files into directory and a vocabulary of `terms` key
+    terms beside it; returns the vocabulary path. Term mentions (term_rate of
+    all words) follow a Zipf(zipf_s) distribution over the vocabulary, the
+    rest is filler. Same arguments, same bytes.
+    """
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ren", "tas", "vo", "qu", "zel", "dar", "ni", "por", "eth"]
+
+    def word(parts: int) -> str:
+        return "".join(rng.choice(syllables) for _ in range(parts))
+
+    vocabulary = sorted({f"{word(3)} {word(2)}" for _ in range(terms * 2)})[:terms]
+    rng.shuffle(vocabulary)  # rank order
+    filler = [word(2) for _ in range(500)]
+    cumulative = list(accumulate(1.0 / (rank ** zipf_s) for rank in range(1, len(vocabulary) + 1)))
+
+    os.makedirs(directory, exist_ok=True)
+    for d in range(docs):
+        out = []
+        for _ in range(words_per_doc):
+            if rng.random() < term_rate:
+                out.append(vocabulary[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])])
+            else:
+                out.append(rng.choice(filler))
+        with open(os.path.join(directory, f"doc{d:05d}.md"), 'w') as f:
+            f.write(f"# Synthetic document {d}\n\n")
+            for start in range(0, len(out), 16):
+                f.write(" ".join(out[start:start + 16]) + "\n")
+
+    vocabulary_path = os.path.join(os.path.dirname(os.path.abspath(directory)), "vocabulary.txt")
+    with open(vocabulary_path, 'w') as f:
+        f.write("\n".join(vocabulary) + "\n")
+    return vocabulary_path
+
+
+def _cumulative_peak_rss_mb() -> float:
+    """
+    Lifetime high-water RSS of this process or of its largest (ingest worker)
+    child: never goes down, so it is not a per-stage figure
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0  # bytes vs KiB
+    return round(max(own, children) / scale, 1)
+
+
+def _rss_bytes(pid) -> int:
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RssSampler:
+    """
+    Samples the current RSS of this process plus its live worker processes
+    every `interval` seconds from a background thread; reset() starts a new
+    stage so each stage reports its own peak. Linux only (/proc); elsewhere
+    peak() is None.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.available = os.path.exists("/proc/self/statm")
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        if self.available:
+            self._thread.start()
+
+    def _sample(self) -> int:
+        total = _rss_bytes("self")
+        for child in multiprocessing.active_children():
+            try:
+                total += _rss_bytes(child.pid)
+            except (OSError, ValueError):
+                pass  # exited between listing and reading
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._record()
+
+    def _record(self):
+        try:
+            rss = self._sample()
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._peak = max(self._peak, rss)
+
+    def reset(self):
+        if self.available:
+            with self._lock:
+                self._peak = 0
+            self._record()
+
+    def peak_mb(self):
+        if not self.available:
+            return None
+        self._record()
+        with self._lock:
+            return round(self._peak / (1024.0 * 1024.0), 1)
+
+    def close(self):
+        self._stop.set()
+
+
+def bench_build(args) -> Dict:
+    """
+    Per-stage wall time and peak RSS of a full build over a synthetic corpus.
+    Parsing and concept matching share one stream in ingest_file, so "parse"
+    is a separate read-only pass and concept_extraction is ingest minus parse.
+    Stage peaks are sampled (this process plus live workers) and reset between
+    stages; cumulative_peak_rss_mb is the whole run's high-water mark.
+    """
+    from pathlib import Path
+    from build_knowledge_graph import KnowledgeGraphBuilder, TextStreamStats
+
+    root = tempfile.mkdtemp(prefix="kg-bench-")
+    research_dir = os.path.join(root, "research")
+    start = time.perf_counter()
+    vocabulary = synthetic_corpus(research_dir, args.docs, args.terms, args.words,
+                                  args.zipf, seed=args.seed)
+    corpus_s = time.perf_counter() - start
+
+    builder = KnowledgeGraphBuilder(research_dir, workers=args.workers, incremental=False,
+                                    vocabulary=vocabulary, export_format=args.format,
+                                    use_parse_cache=False)
+    files = sorted(Path(research_dir).rglob("*.md"))
+    stages: Dict[str, Dict] = {}
+    sampler = RssSampler()
+
+    def stage(name: str, fn: Callable):
+        sampler.reset()
+        began = time.perf_counter()
+        fn()
+        stages[name] = {"seconds": round(time.perf_counter() - began, 4),
+                        "peak_rss_mb": sampler.peak_mb()}
+
+    def parse():
+        for filepath in files:
+            _, chunks = builder.open_text_stream(filepath)
+            for _ in TextStreamStats().observe(chunks):
+                pass
+
+    def ingest():
+        for filepath, content in builder.iter_ingested(files):
+            doc_node = content and builder.build_document_node(filepath, content)
+            if not doc_node:
+                continue
+            builder.add_node(doc_node)
+            for node in builder.build_concept_nodes(content['concepts'], doc_node.id,
+                                                    content.get('concept_counts'),
+                                                    content.get('concept_offsets')):
+                builder.add_node(node)
+
+    stage("parse", parse)
+    stage("ingest", ingest)
+    stages["concept_extraction"] = {
+        "seconds": round(max(0.0, stages["ingest"]["seconds"] - stages["parse"]["seconds"]), 4),
+        "peak_rss_mb": stages["ingest"]["peak_rss_mb"],
+    }
+    stage("relationships", builder.build_concept_relationships)
+    stage("embedding", builder.generate_embeddings)
+    stages["embedding"]["available"] = builder.embedding_matrix is not None
+    stage("analytics", builder.analyze_graph)
+    stage("export", builder.export)
+    sampler.close()
+
+    return {
+        "corpus": {"docs": args.docs, "terms": args.terms, "words_per_doc": args.words,
+                   "zipf": args.zipf, "seed": args.seed, "generate_s": round(corpus_s, 3)},
+        "workers": builder.workers,
+        "nodes": len(builder.nodes),
+        "relationships": len(builder.relationships),
+        "relationship_types": builder.relationships.type_counts(),
+        "stages": stages,
+        "cumulative_peak_rss_mb": _cumulative_peak_rss_mb(),
+    }
+
+
+def bench_query(args) -> Dict:
+    from graph_query import GraphQuery
+
+    start = time.perf_counter()
+    builder, names, concept_ids = synthetic_graph(args.edges)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    query = GraphQuery(builder)
+    index_ms = (time.perf_counter() - start) * 1000.0
+
+    rng = random.Random(11)
+    starts = [rng.choice(concept_ids) for _ in range(args.repeat)]
+    targets = [rng.choice(concept_ids) for _ in range(args.repeat)]
+    term_sets = [rng.sample(names[:200], 2) for _ in range(args.repeat)]
+
+    results = {
+        "edges": len(builder.relationships),
+        "nodes": len(builder.nodes),
+        "graph_build_s": round(build_s, 3),
+        "index_ms": round(index_ms, 3),
+        "neighbours": _time_ms(lambda i: query.neighbours(starts[i]), args.repeat),
+        "k_hop_2@0.5": _time_ms(lambda i: query.k_hop(starts[i], 2, min_strength=0.5), args.repeat),
+        "shortest_path@0.3": _time_ms(
+            lambda i: query.shortest_path(starts[i], targets[i], min_strength=0.3,
+                                          rel_types=["related_to"]), args.repeat),
+        "documents_mentioning_all": _time_ms(
+            lambda i: query.documents_mentioning_all(term_sets[i]), args.repeat),
+    }
+    return results
+
+
+def bench_analytics(args) -> Dict:
+    from graph_analytics import analyze
+
+    builder, _, _ = synthetic_graph(args.edges)
+    start = time.perf_counter()
+    node_ids, scores = analyze(builder)
+    elapsed = time.perf_counter() - start
+    return {
+        "edges": len(builder.relationships),
+        "subgraph_nodes": len(node_ids),
+        "communities": int(scores["community"].max()) + 1 if len(node_ids) else 0,
+        "analyze_s": round(elapsed, 3),
+    }
+
+
+def bench_startup(args) -> Dict:
+    """Wall time of fresh interpreters importing the builder and running --stats-only"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, "build_knowledge_graph.py")
+    research_dir = os.path.join(tempfile.mkdtemp(prefix="kg-bench-"), "research")
+    os.makedirs(research_dir)
+    env = dict(os.environ)
+    env.pop("HUGH_OTLP_ENDPOINT", None)  # measure the default (tracing off) path
+
+    def run(command: List[str]):
+        subprocess.run(command, cwd=here, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+
+    return {
+        "python_baseline": _time_ms(lambda i: run([sys.executable, "-c", "pass"]), args.repeat),
+        "import_builder": _time_ms(
+            lambda i: run([sys.executable, "-c", "import build_knowledge_graph"]), args.repeat),
+        "stats_only": _time_ms(
+            lambda i: run([sys.executable, script, research_dir, "--stats-only"]), args.repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge graph benchmarks")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", help="also write results to this JSON file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    query = sub.add_parser("query", parents=[common],
+                           help="GraphQuery latency on a synthetic graph")
+    query.add_argument("--edges", type=int, default=100000)
+    query.add_argument("--repeat", type=int, default=200)
+    query.set_defaults(run=bench_query)
+
+    analytics = sub.add_parser("analytics", parents=[common],
+                               help="PageRank + community detection time on a synthetic graph")
+    analytics.add_argument("--edges", type=int, default=300000)
+    analytics.set_defaults(run=bench_analytics)
+
+    startup = sub.add_parser("startup", parents=[common],
+                             help="CLI start-up latency (import, --stats-only)")
+    startup.add_argument("--repeat", type=int, default=10)
+    startup.set_defaults(run=bench_startup)
+
+    build = sub.add_parser("build", parents=[common],
+                           help="per-stage build timings and peak RSS on a synthetic Zipfian corpus")
+    build.add_argument("--docs", type=int, default=500)
+    build.add_argument("--terms", type=int, default=2000)
+    build.add_argument("--words", type=int, default=2000, help="words per document")
+    build.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of term frequency")
+    build.add_argument("--workers", type=int, default=1)
+    build.add_argument("--format", choices=("json", "jsonl", "both"), default="json")
+    build.add_argument("--seed", type=int, default=7)
+    build.set_defaults(run=bench_build)
+
+    args = parser.parse_args()
+
+    results = args.run(args)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
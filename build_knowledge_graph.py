@@ -7,35 +7,271 @@ GraphMERT + SNN compatible
 
 import os
 import json
+import math
+import time
 import hashlib
+import signal
+import threading
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import combinations, islice
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass, asdict, fields
 from datetime import datetime
 
-# OpenTelemetry Tracing Setup
-from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from concept_matcher import ConceptMatcher
+from graph_compact import DecayModel, RelationshipStore
+from parse_cache import ParseCache, file_digest
+from graph_sqlite import SqliteGraphStore, SqliteNodeMap, SqliteRelationshipStore
+import telemetry
+from telemetry import traced
 
-resource = Resource(attributes={
-    "service.name": "hugh-knowledge-graph-builder"
-})
-provider = TracerProvider(resource=resource)
-otlp_exporter = OTLPSpanExporter(
-    endpoint="http://localhost:4318/v1/traces",
-)
-processor = BatchSpanProcessor(otlp_exporter)
-provider.add_span_processor(processor)
-trace.set_tracer_provider(provider)
-tracer = trace.get_tracer(__name__)
+# Tracing is opt-in (--trace or HUGH_OTLP_ENDPOINT, see telemetry); heavy
+# libraries below are imported inside the methods that use them
 
 # Will need: pip install PyPDF2 spacy sentence-transformers opentelemetry-sdk opentelemetry-exporter-otlp-proto-http
 # python -m spacy download en_core_web_sm
 
-@dataclass
+# Built-in key terms; extend with a vocabulary file (one term per line)
+KEY_TERMS = [
+    "digital person", "soul anchor", "zord theory", "pheromind",
+    "graphmert", "spiking neural network", "consciousness",
+    "ems ethics", "clan munro", "grizzlymedicine",
+    "operator class", "aragon class", "the workshop",
+    "neurosymbolic", "memory consolidation", "reasoning",
+    "alignment", "substrate independent", "personhood",
+    "14th amendment", "blockchain", "convex",
+]
+
+# Offsets kept per concept mention on extracted_from edges
+MAX_RECORDED_OFFSETS = 20
+
+# Sentence embedding model and encode() batch size
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_BATCH_SIZE = 64
+
+EXPORT_FORMATS = ("json", "jsonl", "both")
+
+# spaCy pipeline, loaded once on first use (NER only)
+SPACY_MODEL = 'en_core_web_sm'
+SPACY_EXCLUDE = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+ENTITY_CHUNK_CHARS = 100000
+ENTITY_BATCH_SIZE = 16
+_nlp = None
+
+def get_nlp():
+    """Return the shared spaCy pipeline, loading it on first call"""
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+    return _nlp
+
+def chunk_text(text: str, max_chars: int) -> Iterator[str]:
+    """Split text into pieces of at most max_chars, preferring line/word breaks"""
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind("\n", start, end)
+        if cut <= start:
+            cut = text.rfind(" ", start, end)
+        if cut <= start:
+            cut = end
+        yield text[start:cut]
+        start = cut
+    if start < len(text) or not text:
+        yield text[start:]
+
+# PDF pages are extracted one at a time; a page taking longer than this is skipped
+PDF_PAGE_TIMEOUT = 30.0
+TEXT_READ_CHARS = 1 << 20
+# Passage (chunk node) overlap in characters when chunking is enabled
+CHUNK_OVERLAP = 200
+# Per-build delta files kept before older ones are folded into the snapshot
+DELTA_RETAIN = 20
+# Edge types prune_relationships may drop by default (extracted_from backs the posting index)
+PRUNABLE_REL_TYPES = ("related_to",)
+# Durable build state (see graph_sqlite), checkpointed every DB_CHECKPOINT_FILES files
+GRAPH_DB_NAME = "graph.sqlite"
+DB_CHECKPOINT_FILES = 100
+# Past this many nodes + relationships a --db build is served from the database
+DB_PAGE_RECORDS = 1000000
+
+class PageTimeout(Exception):
+    pass
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    """Raise PageTimeout after `seconds` (SIGALRM; no-op off the main thread or on Windows)"""
+    usable = (seconds and hasattr(signal, "setitimer")
+              and threading.current_thread() is threading.main_thread())
+    if not usable:
+        yield
+        return
+    
+    def _expired(signum, frame):
+        raise PageTimeout()
+    
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+class PdfPageStream:
+    """Iterate a PDF's page texts without building the whole document string"""
+    
+    def __init__(self, filepath: Path, page_timeout: Optional[float] = PDF_PAGE_TIMEOUT):
+        import PyPDF2
+        self.filepath = filepath
+        self.page_timeout = page_timeout
+        with open(filepath, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+            self.page_count = len(reader.pages)
+            self.metadata = reader.metadata if hasattr(reader, 'metadata') else {}
+    
+    def __iter__(self) -> Iterator[str]:
+        import PyPDF2
+        with open(self.filepath, 'rb') as f:
+            reader = PyPDF2.PdfReader(f)
+            for number, page in enumerate(reader.pages):
+                try:
+                    with _deadline(self.page_timeout):
+                        text = page.extract_text() or ""
+                except PageTimeout:
+                    print(f"Page {number + 1} of {self.filepath.name} timed out, skipping")
+                    continue
+                yield text
+
+def _iter_text_file(filepath: Path) -> Iterator[str]:
+    with open(filepath, 'r', encoding='utf-8') as f:
+        while True:
+            block = f.read(TEXT_READ_CHARS)
+            if not block:
+                return
+            yield block
+
+def _safe_file_digest(filepath: Path) -> Optional[str]:
+    try:
+        return file_digest(filepath)
+    except OSError as e:
+        print(f"Error reading {filepath}: {e}")
+        return None
+
+class PassageChunker:
+    """
+    Fixed-size overlapping passages over chunked text, as character offsets
+    into the joined text; with keep_text each passage also carries its text
+    (otherwise it is cut later by slice_passages). Only the current window
+    is buffered.
+    """
+    
+    def __init__(self, size: int, overlap: int = CHUNK_OVERLAP, keep_text: bool = False):
+        if not 0 <= overlap < size:
+            raise ValueError(f"Chunk overlap must be smaller than the chunk size ({overlap} >= {size})")
+        self.size = size
+        self.step = size - overlap
+        self.keep_text = keep_text
+        self.passages: List[Dict] = []
+        self._buffer = ""
+        self._buffer_start = 0
+    
+    def _emit(self, start: int, text: str):
+        if text.strip():
+            passage = {"start": start, "end": start + len(text)}
+            if self.keep_text:
+                passage["text"] = text
+            self.passages.append(passage)
+    
+    def observe(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Pass chunks through while cutting passages; the tail is flushed when the stream ends"""
+        for chunk in chunks:
+            buffer = self._buffer + chunk
+            pos = 0
+            while len(buffer) - pos >= self.size:
+                self._emit(self._buffer_start + pos, buffer[pos:pos + self.size])
+                pos += self.step
+            self._buffer = buffer[pos:]
+            self._buffer_start += pos
+            yield chunk
+        # The last full passage already covers `overlap` chars of what is left
+        covered = self.size - self.step if self._buffer_start else 0
+        if len(self._buffer) > covered:
+            self._emit(self._buffer_start, self._buffer)
+    
+    def assign_concepts(self, occurrences: Dict[str, List[int]]):
+        """Count each passage's whole-term mentions (term -> sorted offsets)"""
+        # Passages start on multiples of step, so each offset only checks the
+        # few passages starting in (offset - size, offset]
+        by_slot = {}
+        for passage in self.passages:
+            passage["concepts"] = {}
+            by_slot[passage["start"] // self.step] = passage
+        for term, offsets in occurrences.items():
+            length = len(term)
+            for offset in offsets:
+                first = max(0, (offset - self.size) // self.step + 1)
+                for slot in range(first, offset // self.step + 1):
+                    passage = by_slot.get(slot)
+                    if passage is not None and offset + length <= passage["end"]:
+                        counts = passage["concepts"]
+                        counts[term] = counts.get(term, 0) + 1
+
+def slice_passages(chunks: Iterable[str], passages: List[Dict]) -> Iterator[str]:
+    """Texts of passages (by start offset) cut from chunked text, buffering one window"""
+    chunks = iter(chunks)
+    buffer, buffer_start = "", 0
+    for passage in passages:
+        while buffer_start + len(buffer) < passage["end"]:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            buffer += chunk
+        buffer = buffer[passage["start"] - buffer_start:]
+        buffer_start = passage["start"]
+        yield buffer[:passage["end"] - passage["start"]]
+
+def _record_digest(record: Dict) -> int:
+    """64-bit content hash of an exported node/relationship record"""
+    encoded = json.dumps(record, sort_keys=True, separators=(',', ':')).encode()
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), 'little')
+
+def _mention_strength(count: int) -> float:
+    """Edge strength for a concept mentioned `count` times: 0.9 once, saturating at 1.0 by ten"""
+    return min(1.0, 0.9 + 0.1 * math.log10(max(count, 1)))
+
+class TextStreamStats:
+    """Hash, character and word counts over chunked text, equal to the joined text's"""
+    
+    def __init__(self):
+        self._sha = hashlib.sha256()
+        self.char_count = 0
+        self.word_count = 0
+        self._ends_in_word = False
+    
+    def observe(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Pass chunks through while accumulating stats"""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            self._sha.update(chunk.encode())
+            self.char_count += len(chunk)
+            words = len(chunk.split())
+            # A word split across the chunk boundary was counted twice
+            if words and self._ends_in_word and not chunk[0].isspace():
+                words -= 1
+            self.word_count += words
+            self._ends_in_word = not chunk[-1].isspace()
+            yield chunk
+    
+    def hexdigest(self) -> str:
+        return self._sha.hexdigest()
+
+@dataclass(slots=True)
 class Node:
     id: str
     type: str
@@ -47,12 +283,13 @@ class Node:
     
     def __post_init__(self):
         if self.created is None:
-            self.created = datetime.now().timestamp()
+            self.created = time.time()
         if self.last_accessed is None:
             self.last_accessed = self.created
 
-@dataclass
+@dataclass(slots=True)
 class Relationship:
+    """Relationship record; the store keeps these as typed-array rows (see graph_compact)"""
     from_id: str
     to_id: str
     rel_type: str
@@ -65,24 +302,133 @@ class Relationship:
     
     def __post_init__(self):
         if self.created is None:
-            self.created = datetime.now().timestamp()
+            self.created = time.time()
         if self.last_reinforced is None:
             self.last_reinforced = self.created
 
 class KnowledgeGraphBuilder:
-    def __init__(self, research_dir: str):
+    MANIFEST_VERSION = 1
+    
+    def __init__(self, research_dir: str, workers: int = None, incremental: bool = True,
+                 vocabulary: str = None, semantic_threshold: float = None,
+                 export_format: str = "json", page_timeout: Optional[float] = PDF_PAGE_TIMEOUT,
+                 use_parse_cache: bool = True, decay_half_life_days: float = None,
+                 prune_floor: float = None, use_graph_db: bool = False,
+                 chunk_chars: int = None, chunk_overlap: int = CHUNK_OVERLAP,
+                 max_deltas: int = DELTA_RETAIN, db_page_records: int = DB_PAGE_RECORDS):
         self.research_dir = Path(research_dir)
+        self.output_dir = self.research_dir.parent / "knowledge_graph_output"
+        # Ingestion worker processes (1 = parse serially on the main thread)
+        self.workers = workers or os.cpu_count() or 1
+        # Parsed text/concepts keyed by raw file hash, shared by duplicate files
+        self.parse_cache = ParseCache(self.output_dir / "parse_cache") if use_parse_cache else None
+        # Seconds allowed per PDF page before it is skipped (None = no limit)
+        self.page_timeout = page_timeout
+        # Reuse the previous build for files whose manifest entry still matches
+        self.incremental = incremental
+        self.manifest: Dict[str, Dict] = {}
+        # "json" (pretty nodes.json/relationships.json), "jsonl" (streaming) or "both"
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        self.export_format = export_format
+        # Cosine threshold for kNN-inferred related_to edges (None = off)
+        self.semantic_threshold = semantic_threshold
+        # Key-term automaton (built-ins plus optional external vocabulary)
+        self.vocabulary = vocabulary
+        if vocabulary:
+            self.concept_matcher = ConceptMatcher.from_file(vocabulary, KEY_TERMS)
+        else:
+            self.concept_matcher = ConceptMatcher(KEY_TERMS)
+        # Passages of chunk_chars with chunk_overlap become chunk nodes (None = off)
+        self.chunk_chars = chunk_chars or None
+        self.chunk_overlap = chunk_overlap
+        # Checked here, not per file, so a bad setting fails before any ingestion
+        if self.chunk_chars and not 0 <= chunk_overlap < self.chunk_chars:
+            raise ValueError(f"Chunk overlap must be in [0, chunk size) ({chunk_overlap} vs {self.chunk_chars})")
+        # Fingerprint of everything ingest_file extracts: cached summaries and
+        # previous builds are only reused when it matches
+        extraction = list(self.concept_matcher.terms)
+        if self.chunk_chars:
+            # "offsets": cached passages no longer carry their text
+            extraction.append(f"chunks:{self.chunk_chars}:{self.chunk_overlap}:offsets")
+        self.vocabulary_hash = hashlib.sha256(
+            "\n".join(extraction).encode()).hexdigest()[:16]
+        # Edge strength halves every decay_half_life_days without reinforcement
+        # (None = no decay); edges decayed below prune_floor are dropped at export
+        self.decay = DecayModel(decay_half_life_days * 86400.0) if decay_half_life_days else None
+        self.prune_floor = prune_floor
+        # Pruned co-occurrence pairs ("from\tto") -> shared documents when pruned;
+        # they stay out of the graph until they share more documents than that
+        self.pruned_pairs: Dict[str, int] = {}
         self.nodes: Dict[str, Node] = {}
-        self.relationships: List[Relationship] = []
         self.document_hashes: Set[str] = set()
+        # Optional SQLite copy of nodes/relationships/hashes/manifest: changes are
+        # tracked in memory and written back by checkpoint(), so a crashed build
+        # resumes from the last checkpoint instead of starting over. Once the
+        # graph passes db_page_records (0 = never) it is paged out: nodes and
+        # relationships are served from the database (see _page_out)
+        self.graph_db = SqliteGraphStore(self.output_dir / GRAPH_DB_NAME) if use_graph_db else None
+        self.db_page_records = db_page_records
+        self.paged = False
+        self._dirty_nodes: Set[str] = set()
+        self._removed_nodes: Set[str] = set()
+        self._dirty_paths: Set[str] = set()
+        self._db_hashes: Set[str] = set()
+        self._db_paths: Set[str] = set()
+        self.relationships = self._new_relationship_store()
+        # Posting indexes maintained by build_concept_nodes
+        self.concept_documents: Dict[str, Set[str]] = {}
+        self.document_concepts: Dict[str, Set[str]] = {}
+        # Concept embeddings: float32 matrix + node_id -> row
+        self.embedding_matrix = None
+        self.embedding_rows: Dict[str, int] = {}
+        # Chunk embeddings: unit-norm float32 matrix memory-mapped from the output dir
+        self.chunk_matrix = None
+        self.chunk_rows: Dict[str, int] = {}
+        # Summary of the last analyze_graph() run, written to stats.json
+        self.analytics: Dict = {}
+        # Delta publishing: digests of the previous build's records (None = no
+        # previous build loaded) and how many per-build deltas to keep (0 = off)
+        self.max_deltas = max_deltas
+        self.build_seq = 0
+        self._baseline_nodes: Optional[Dict[str, int]] = None
+        self._baseline_edges: Optional[Dict[int, int]] = None
         
     def generate_id(self, type: str, name: str) -> str:
         """Generate unique deterministic ID"""
         content = f"{type}:{name}".lower()
         return hashlib.sha256(content.encode()).hexdigest()[:16]
     
+    def _new_relationship_store(self) -> RelationshipStore:
+        store = RelationshipStore(self.decay)
+        if self.graph_db is not None:
+            store.track_changes()
+        return store
+    
+    def _page_out(self):
+        """
+        Swap the in-memory nodes and relationships for the graph database's
+        tables. The database must hold the current graph (just checkpointed or
+        loaded). Posting indexes, the manifest and delta baselines stay in memory.
+        """
+        self.nodes = SqliteNodeMap(self.graph_db, Node)
+        # The interners carry over so key codes already handed out stay valid
+        self.relationships = SqliteRelationshipStore(self.graph_db, self.decay,
+                                                     self.relationships.node_ids,
+                                                     self.relationships.rel_types)
+        self.paged = True
+    
+    def _touch_node(self, node_id: str):
+        """Mark a node for write-back at the next checkpoint"""
+        if self.paged:
+            self.nodes.touch(node_id)
+        elif self.graph_db is not None:
+            self._dirty_nodes.add(node_id)
+            self._removed_nodes.discard(node_id)
+    
     def add_node(self, node: Node) -> Node:
         """Add node to graph, merge if exists"""
+        self._touch_node(node.id)
         if node.id in self.nodes:
             # Merge data, increment access count
             existing = self.nodes[node.id]
@@ -94,40 +440,40 @@ class KnowledgeGraphBuilder:
             self.nodes[node.id] = node
             return node
     
+    def remove_node(self, node_id: str) -> Optional[Node]:
+        """Remove a node together with every edge touching it"""
+        for rel in self.relationships.outgoing(node_id) + self.relationships.incoming(node_id):
+            self.relationships.remove(rel.from_id, rel.to_id, rel.rel_type)
+        if self.graph_db is not None and not self.paged:
+            self._dirty_nodes.discard(node_id)
+            self._removed_nodes.add(node_id)
+        return self.nodes.pop(node_id, None)
+    
     def add_relationship(self, rel: Relationship):
         """Add relationship, strengthen if exists"""
-        # Check if relationship exists
-        for existing in self.relationships:
-            if (existing.from_id == rel.from_id and 
-                existing.to_id == rel.to_id and
-                existing.rel_type == rel.rel_type):
-                # Strengthen existing
-                existing.reinforcement_count += 1
-                existing.last_reinforced = datetime.now().timestamp()
-                existing.strength = min(1.0, existing.strength + 0.1)
-                return existing
+        existing = self.relationships.get(rel.from_id, rel.to_id, rel.rel_type)
+        if existing is not None:
+            # Strengthen existing (from its decayed value, then restart the clock)
+            now = datetime.now().timestamp()
+            existing.reinforcement_count += 1
+            existing.strength = min(1.0, existing.effective_strength(now) + 0.1)
+            existing.last_reinforced = now
+            return existing
         
         # New relationship
-        self.relationships.append(rel)
-        return rel
+        return self.relationships.add(rel)
     
-    @tracer.start_as_current_span("parse_pdf")
+    @traced("parse_pdf")
     def parse_pdf(self, filepath: Path) -> Dict:
         """Extract text and metadata from PDF"""
         try:
-            import PyPDF2
-            with open(filepath, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                
-                return {
-                    'title': filepath.stem,
-                    'text': text,
-                    'page_count': len(reader.pages),
-                    'metadata': reader.metadata if hasattr(reader, 'metadata') else {}
-                }
+            stream = PdfPageStream(filepath, self.page_timeout)
+            return {
+                'title': filepath.stem,
+                'text': "".join(stream),  # only joined when a caller needs the whole text
+                'page_count': stream.page_count,
+                'metadata': stream.metadata,
+            }
         except Exception as e:
             print(f"Error parsing {filepath}: {e}")
             return None
@@ -145,48 +491,181 @@ class KnowledgeGraphBuilder:
             print(f"Error parsing {filepath}: {e}")
             return None
     
+    def open_text_stream(self, filepath: Path) -> Tuple[Optional[int], Iterator[str]]:
+        """(page_count, text chunks) for a file, one PDF page / text block at a time"""
+        if filepath.suffix == '.pdf':
+            stream = PdfPageStream(filepath, self.page_timeout)
+            return stream.page_count, iter(stream)
+        return None, _iter_text_file(filepath)
+    
+    def iter_document_text(self, filepath: Path) -> Iterator[str]:
+        """
+        Text chunks of a file, from the parse cache when it has them. PDFs
+        ingested without a cache ship their passage texts instead, so this
+        only re-parses a PDF whose cached text has gone missing.
+        """
+        cache = self.parse_cache
+        if cache is not None and filepath.suffix == '.pdf':
+            digest = file_digest(filepath)
+            if cache.has_text(digest):
+                return cache.iter_text(digest)
+        return self.open_text_stream(filepath)[1]
+    
     def extract_entities(self, text: str) -> List[Tuple[str, str]]:
         """Extract named entities using spaCy"""
+        return self.extract_entities_batch([text])[0]
+    
+    def extract_entities_batch(self, texts: List[str], batch_size: int = ENTITY_BATCH_SIZE,
+                               n_process: int = 1) -> List[List[Tuple[str, str]]]:
+        """Extract named entities for many texts in one nlp.pipe pass"""
+        results: List[List[Tuple[str, str]]] = [[] for _ in texts]
         try:
-            import spacy
-            nlp = spacy.load('en_core_web_sm')
-            doc = nlp(text[:100000])  # Limit to avoid memory issues
-            
-            entities = []
-            for ent in doc.ents:
-                entities.append((ent.text, ent.label_))
-            return entities
+            nlp = get_nlp()
+            # Long documents are chunked instead of truncated
+            pieces = ((chunk, i) for i, text in enumerate(texts)
+                      for chunk in chunk_text(text, ENTITY_CHUNK_CHARS))
+            for doc, i in nlp.pipe(pieces, as_tuples=True,
+                                   batch_size=batch_size, n_process=n_process):
+                results[i].extend((ent.text, ent.label_) for ent in doc.ents)
         except Exception as e:
             print(f"Entity extraction failed: {e}")
-            return []
+        return results
     
     def extract_concepts(self, text: str, title: str) -> List[str]:
         """Extract key concepts from text"""
+        return list(self.match_concepts(text))
+    
+    def match_concepts(self, text: str) -> Dict[str, List[int]]:
+        """Whole-word key-term occurrences (term -> offsets) in one automaton pass"""
         # Simple keyword-based extraction for now
         # In production, use better NLP or LLM-based extraction
+        return self.concept_matcher.find_all(text)
+    
+    @traced("ingest_file")
+    def ingest_file(self, filepath: Path, digest: str = None) -> Optional[Dict]:
+        """Parse, hash and extract concepts from one file (runs in ingest workers)"""
+        if filepath.suffix not in ['.pdf', '.md', '.txt']:
+            return None
         
-        key_terms = [
-            "digital person", "soul anchor", "zord theory", "pheromind",
-            "graphmert", "spiking neural network", "consciousness",
-            "ems ethics", "clan munro", "grizzlymedicine",
-            "operator class", "aragon class", "the workshop",
-            "neurosymbolic", "memory consolidation", "reasoning",
-            "alignment", "substrate independent", "personhood",
-            "14th amendment", "blockchain", "convex",
-        ]
+        # Hashing, counting and concept matching all consume the same chunk
+        # stream, so only one page (plus a short matcher tail) is in memory
+        cache = self.parse_cache
+        try:
+            if cache is not None and digest is None:
+                digest = file_digest(filepath)
+            cached = cache.get(digest) if cache is not None else None
+            if cached and cached.get("vocabulary_hash") == self.vocabulary_hash:
+                return dict(cached["summary"], title=filepath.stem)
+            
+            if cached and cache.has_text(digest):
+                # Parsed under another vocabulary: re-match the cached text
+                page_count, chunks = cached["summary"]["page_count"], cache.iter_text(digest)
+            else:
+                page_count, chunks = self.open_text_stream(filepath)
+                if cache is not None and filepath.suffix == '.pdf':
+                    chunks = cache.tee_text(digest, chunks)
+            
+            stats = TextStreamStats()
+            stream = stats.observe(chunks)
+            # Without a cache the main process could only get a PDF's text by
+            # parsing it again, so those passages carry their text back
+            keep_text = cache is None and filepath.suffix == '.pdf'
+            chunker = PassageChunker(self.chunk_chars, self.chunk_overlap, keep_text) \
+                if self.chunk_chars else None
+            if chunker is not None:
+                stream = chunker.observe(stream)
+            occurrences = self.concept_matcher.find_all_stream(stream)
+        except Exception as e:
+            print(f"Error parsing {filepath}: {e}")
+            return None
         
-        found_concepts = []
-        text_lower = text.lower()
+        # Only the summary crosses the process boundary, not the full text
+        summary = {
+            'title': filepath.stem,
+            'page_count': page_count,
+            'content_hash': stats.hexdigest(),
+            'char_count': stats.char_count,
+            'word_count': stats.word_count,
+            'concepts': list(occurrences),
+            'concept_counts': {c: len(offsets) for c, offsets in occurrences.items()},
+            'concept_offsets': {c: offsets[:MAX_RECORDED_OFFSETS]
+                                for c, offsets in occurrences.items()},
+        }
+        if chunker is not None:
+            chunker.assign_concepts(occurrences)
+            summary['passages'] = chunker.passages
+        if cache is not None:
+            cache.put(digest, {"vocabulary_hash": self.vocabulary_hash, "summary": summary})
+        return summary
+    
+    def iter_ingested(self, files: List[Path]) -> Iterator[Tuple[Path, Optional[Dict]]]:
+        """Ingest files in a process pool, yielding results in file order"""
+        # Byte-identical copies (e.g. "paper (1).pdf") are hashed up front and
+        # reuse the first copy's result instead of being parsed again
+        results_by_digest: Dict[str, Optional[Dict]] = {}
+        
+        def reuse(filepath: Path, digest: str) -> Optional[Dict]:
+            result = results_by_digest[digest]
+            return dict(result, title=filepath.stem) if result else None
         
-        for term in key_terms:
-            if term in text_lower:
-                found_concepts.append(term)
+        if self.workers <= 1 or len(files) <= 1:
+            for filepath in files:
+                digest = _safe_file_digest(filepath)
+                if digest is not None and digest in results_by_digest:
+                    yield filepath, reuse(filepath, digest)
+                    continue
+                result = self.ingest_file(filepath, digest)
+                if digest is not None:
+                    results_by_digest[digest] = result
+                yield filepath, result
+            return
         
-        return found_concepts
+        # Bound in-flight work so results never pile up in memory
+        max_in_flight = self.workers * 2
+        remaining = iter(files)
+        submitted: Set[str] = set()
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_ingest_worker,
+                                 initargs=(str(self.research_dir), self.worker_options(),
+                                           telemetry.endpoint())) as pool:
+            def submit(filepath: Path):
+                digest = _safe_file_digest(filepath)
+                if digest is not None and digest in submitted:
+                    return filepath, digest, None
+                if digest is not None:
+                    submitted.add(digest)
+                return filepath, digest, pool.submit(_ingest_in_worker, filepath, digest)
+            
+            pending = deque(submit(f) for f in islice(remaining, max_in_flight))
+            while pending:
+                filepath, digest, future = pending.popleft()
+                if future is None:
+                    # Earlier copy was queued first, so its result is already in
+                    result = reuse(filepath, digest)
+                else:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Error ingesting {filepath}: {e}")
+                        result = None
+                    if digest is not None:
+                        results_by_digest[digest] = result
+                
+                next_file = next(remaining, None)
+                if next_file is not None:
+                    pending.append(submit(next_file))
+                
+                yield filepath, result
+    
+    def worker_options(self) -> Dict:
+        """Builder settings ingestion workers need to reproduce ingest_file"""
+        return {"vocabulary": self.vocabulary, "page_timeout": self.page_timeout,
+                "use_parse_cache": self.parse_cache is not None,
+                "chunk_chars": self.chunk_chars, "chunk_overlap": self.chunk_overlap}
     
     def build_document_node(self, filepath: Path, content: Dict) -> Node:
-        """Create document node from parsed content"""
-        file_hash = hashlib.sha256(content['text'].encode()).hexdigest()
+        """Create document node from an ingested file summary"""
+        file_hash = content['content_hash']
         
         if file_hash in self.document_hashes:
             print(f"Skipping duplicate: {filepath.name}")
@@ -201,7 +680,7 @@ class KnowledgeGraphBuilder:
             doc_type = "whitepaper"
         elif any(x in filepath.name.lower() for x in ['spec', 'specification']):
             doc_type = "specification"
-        elif filepath.suffix == '.pdf' and len(content['text']) > 5000:
+        elif filepath.suffix == '.pdf' and content['char_count'] > 5000:
             doc_type = "research_paper"
         else:
             doc_type = "notes"
@@ -215,15 +694,19 @@ class KnowledgeGraphBuilder:
                 "filepath": str(filepath),
                 "content_hash": file_hash,
                 "page_count": content.get('page_count'),
-                "word_count": len(content['text'].split()),
+                "word_count": content['word_count'],
             }
         )
         
         return node
     
-    def build_concept_nodes(self, concepts: List[str], document_id: str) -> List[Node]:
+    def build_concept_nodes(self, concepts: List[str], document_id: str,
+                            counts: Dict[str, int] = None,
+                            offsets: Dict[str, List[int]] = None) -> List[Node]:
         """Create concept nodes and link to document"""
         nodes = []
+        counts = counts or {}
+        offsets = offsets or {}
         
         for concept in concepts:
             concept_id = self.generate_id("concept", concept)
@@ -240,17 +723,58 @@ class KnowledgeGraphBuilder:
             
             nodes.append(node)
             
-            # Link concept to document
+            # Link concept to document, weighted by how often it is mentioned
+            count = counts.get(concept, 1)
             rel = Relationship(
                 from_id=concept_id,
                 to_id=document_id,
                 rel_type="extracted_from",
-                strength=0.9
+                strength=_mention_strength(count),
+                metadata={
+                    "occurrences": count,
+                    "offsets": offsets.get(concept, []),
+                } if concept in counts else None
             )
             self.add_relationship(rel)
+            
+            self.concept_documents.setdefault(concept_id, set()).add(document_id)
+            self.document_concepts.setdefault(document_id, set()).add(concept_id)
         
         return nodes
     
+    def build_chunk_nodes(self, passages: List[Dict], document_id: str,
+                          texts: List[str]) -> List[Node]:
+        """Create passage nodes (part_of the document) and link the concepts they mention"""
+        nodes = []
+        for index, (passage, text) in enumerate(zip(passages, texts)):
+            chunk_id = self.generate_id("chunk", f"{document_id}:{index}")
+            nodes.append(Node(
+                id=chunk_id,
+                type="chunk",
+                data={
+                    "document_id": document_id,
+                    "index": index,
+                    "start": passage["start"],
+                    "end": passage["end"],
+                    "text": text,
+                }
+            ))
+            self.add_relationship(Relationship(
+                from_id=chunk_id,
+                to_id=document_id,
+                rel_type="part_of",
+                strength=1.0,
+            ))
+            for concept, count in passage.get("concepts", {}).items():
+                self.add_relationship(Relationship(
+                    from_id=self.generate_id("concept", concept),
+                    to_id=chunk_id,
+                    rel_type="mentioned_in",
+                    strength=_mention_strength(count),
+                    metadata={"occurrences": count},
+                ))
+        return nodes
+    
     def build_soul_anchor_nodes(self) -> List[Node]:
         """Create nodes for H.U.G.H.'s soul anchor system"""
         anchors = [
@@ -308,22 +832,229 @@ class KnowledgeGraphBuilder:
         
         return nodes
     
-    @tracer.start_as_current_span("process_all_documents")
+    def load_previous_build(self) -> bool:
+        """Load the last build (graph database, else exported graph + manifest) for an incremental rebuild"""
+        try:
+            if self.graph_db is not None:
+                version = self.graph_db.get_meta("version")
+                if version is None:
+                    return False
+                manifest = {"version": int(version),
+                            "vocabulary_hash": self.graph_db.get_meta("vocabulary_hash"),
+                            "pruned_pairs": json.loads(self.graph_db.get_meta("pruned_pairs") or "{}")}
+            else:
+                manifest_path = self.output_dir / "manifest.json"
+                if not manifest_path.exists():
+                    return False
+                with open(manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            if manifest.get("version") != self.MANIFEST_VERSION:
+                return False
+            if manifest.get("vocabulary_hash") != self.vocabulary_hash:
+                print("Concept vocabulary changed, rebuilding from scratch")
+                return False
+            if self.graph_db is not None:
+                if self.db_page_records and self.graph_db.count() > self.db_page_records:
+                    # Too big to load: serve it from the database, only digest it here
+                    self._page_out()
+                nodes_data, rels_data = self.graph_db.iter_nodes(), self.graph_db.iter_relationships()
+            else:
+                nodes_data, rels_data = self._read_exported_graph()
+            
+            # Digests of what was loaded, to publish only what this build changes
+            baseline_nodes: Dict[str, int] = {}
+            baseline_edges: Dict[int, int] = {}
+            for data in nodes_data:
+                # Embeddings are rebuilt from the on-disk cache, not kept as lists
+                data["embedding"] = None
+                node = Node(**data)
+                if not self.paged:
+                    self.nodes[node.id] = node
+                baseline_nodes[node.id] = _record_digest(data)
+                if node.type == "document" and node.data.get("content_hash"):
+                    self.document_hashes.add(node.data["content_hash"])
+            
+            for data in rels_data:
+                data.pop("effective_strength", None)  # materialised at export time only
+                rel = Relationship(**data)
+                if not self.paged:
+                    rel = self.relationships.add(rel)
+                baseline_edges[self.relationships.key_code(rel)] = _record_digest(data)
+                if rel.rel_type == "extracted_from":
+                    self.concept_documents.setdefault(rel.from_id, set()).add(rel.to_id)
+                    self.document_concepts.setdefault(rel.to_id, set()).add(rel.from_id)
+            
+            if self.graph_db is not None:
+                # A checkpoint newer than the last export is no delta baseline:
+                # consumers hold the exported snapshot, not this state
+                from graph_export import read_delta_log
+                if self.graph_db.get_meta("export_seq") != str(read_delta_log(self.output_dir)["seq"]):
+                    print("Graph database is ahead of the last export, deltas restart from a snapshot")
+                    baseline_nodes = baseline_edges = None
+                self.document_hashes = self.graph_db.document_hashes()
+                manifest["files"] = self.graph_db.manifest()
+                # What was just loaded is already stored
+                self.relationships.drain_changes()
+                self._db_hashes = set(self.document_hashes)
+                self._db_paths = set(manifest["files"])
+        except Exception as e:
+            print(f"Previous build unusable, rebuilding from scratch: {e}")
+            self.nodes = {}
+            self.paged = False
+            self.relationships = self._new_relationship_store()
+            self.document_hashes.clear()
+            self.concept_documents.clear()
+            self.document_concepts.clear()
+            return False
+        
+        self.manifest = manifest["files"]
+        self.pruned_pairs = manifest.get("pruned_pairs", {})
+        self._baseline_nodes, self._baseline_edges = baseline_nodes, baseline_edges
+        return True
+    
+    def _read_exported_graph(self) -> Tuple[Iterator[Dict], Iterator[Dict]]:
+        """Node and relationship dicts from the last export, streaming when possible"""
+        from graph_export import GraphReader
+        if GraphReader.exists(self.output_dir) and \
+                (self.export_format != "json" or not (self.output_dir / "nodes.json").exists()):
+            reader = GraphReader(self.output_dir)
+            return reader.nodes(), reader.relationships()
+        
+        with open(self.output_dir / "nodes.json", 'r') as f:
+            nodes_data = json.load(f)
+        with open(self.output_dir / "relationships.json", 'r') as f:
+            rels_data = json.load(f)
+        return iter(nodes_data.values()), iter(rels_data)
+    
+    def retract_file(self, path: str):
+        """Remove every node and edge a file contributed to the graph"""
+        entry = self.manifest.pop(path, None)
+        if not entry or entry.get("status") != "indexed":
+            return
+        
+        for from_id, to_id, rel_type in entry.get("edges", []):
+            self.relationships.remove(from_id, to_id, rel_type)
+        
+        for document_id in entry.get("nodes", []):
+            # Concepts only mentioned by this document go with it
+            for concept_id in self.document_concepts.pop(document_id, set()):
+                docs = self.concept_documents.get(concept_id, set())
+                docs.discard(document_id)
+                if not docs:
+                    self.concept_documents.pop(concept_id, None)
+                    self.remove_node(concept_id)
+            self.remove_node(document_id)
+        
+        self.document_hashes.discard(entry.get("content_hash"))
+    
+    def plan_incremental(self, files: List[Path]) -> Tuple[List[Path], Dict[str, os.stat_result]]:
+        """Retract changed/deleted files and return the files that need ingesting"""
+        stats = {str(f): f.stat() for f in files}
+        
+        stale = [path for path in self.manifest if path not in stats]
+        for path, st in stats.items():
+            entry = self.manifest.get(path)
+            if entry and (entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns):
+                stale.append(path)
+        
+        retracted_hashes = set()
+        for path in stale:
+            entry = self.manifest.get(path, {})
+            if entry.get("status") == "indexed":
+                retracted_hashes.add(entry.get("content_hash"))
+            self.retract_file(path)
+            self.manifest.pop(path, None)
+        
+        # Copies of a retracted document may now be the only instance
+        for path, entry in list(self.manifest.items()):
+            if entry.get("status") == "duplicate" and entry.get("content_hash") in retracted_hashes:
+                del self.manifest[path]
+        
+        return [f for f in files if str(f) not in self.manifest], stats
+    
+    def record_manifest_entry(self, filepath: Path, st: os.stat_result,
+                              content: Optional[Dict], doc_node: Optional[Node]):
+        """Remember what a file produced so a later build can skip or retract it"""
+        entry = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "content_hash": content["content_hash"] if content else None,
+            "status": "error" if not content else ("indexed" if doc_node else "duplicate"),
+            "nodes": [],
+            "edges": [],
+        }
+        if doc_node:
+            # Chunks are retracted with their document (remove_node drops their edges)
+            entry["nodes"] = [doc_node.id] + [r.from_id for r in
+                                              self.relationships.incoming(doc_node.id, "part_of")]
+            entry["edges"] = [[r.from_id, r.to_id, r.rel_type]
+                              for r in self.relationships.incoming(doc_node.id)]
+        self.manifest[str(filepath)] = entry
+        self._dirty_paths.add(str(filepath))
+    
+    def checkpoint(self):
+        """Write everything changed since the last checkpoint to the graph database (one transaction)"""
+        if self.graph_db is None:
+            return
+        if self.paged:
+            # Paged edits already sit in the open transaction; write() commits them
+            self.nodes.flush()
+        relationships, removed_relationships = self.relationships.drain_changes()
+        paths = set(self.manifest)
+        self.graph_db.write(
+            nodes=[self.nodes[node_id] for node_id in self._dirty_nodes if node_id in self.nodes],
+            removed_nodes=self._removed_nodes,
+            relationships=relationships,
+            removed_relationships=removed_relationships,
+            added_hashes=self.document_hashes - self._db_hashes,
+            removed_hashes=self._db_hashes - self.document_hashes,
+            manifest={path: self.manifest[path] for path in self._dirty_paths if path in paths},
+            removed_paths=self._db_paths - paths,
+            # export_seq is cleared until export() records the build this state was exported as
+            meta={"version": str(self.MANIFEST_VERSION), "vocabulary_hash": self.vocabulary_hash,
+                  "pruned_pairs": json.dumps(self.pruned_pairs), "export_seq": ""},
+        )
+        self._dirty_nodes, self._removed_nodes, self._dirty_paths = set(), set(), set()
+        self._db_hashes, self._db_paths = set(self.document_hashes), paths
+        if not self.paged and self.db_page_records and \
+                len(self.nodes) + len(self.relationships) > self.db_page_records:
+            print(f"Graph passed {self.db_page_records} records, serving it from {GRAPH_DB_NAME}")
+            self._page_out()
+    
+    def export_manifest(self):
+        with open(self.output_dir / "manifest.json", 'w') as f:
+            json.dump({
+                "version": self.MANIFEST_VERSION,
+                "vocabulary_hash": self.vocabulary_hash,
+                "files": self.manifest,
+                "pruned_pairs": self.pruned_pairs,
+            }, f, indent=2)
+    
+    @traced("process_all_documents")
     def process_all_documents(self):
         """Main processing pipeline"""
         print("=" * 60)
         print("H.U.G.H. Knowledge Graph Builder")
         print("=" * 60)
         
+        resumed = self.incremental and self.load_previous_build()
+        if resumed:
+            print(f"Loaded previous build: {len(self.nodes)} nodes, {len(self.manifest)} files in manifest")
+        elif self.graph_db is not None:
+            self.graph_db.clear()
+        
         # First, create soul anchor nodes
-        print("\n[1/5] Building soul anchor nodes...")
-        anchor_nodes = self.build_soul_anchor_nodes()
-        for node in anchor_nodes:
-            self.add_node(node)
-        print(f"Created {len(anchor_nodes)} anchor nodes")
+        print("\n[1/6] Building soul anchor nodes...")
+        if resumed and any(n.type == "anchor" for n in self.nodes.values()):
+            print("Anchor nodes carried over from previous build")
+        else:
+            anchor_nodes = self.build_soul_anchor_nodes()
+            for node in anchor_nodes:
+                self.add_node(node)
+            print(f"Created {len(anchor_nodes)} anchor nodes")
         
         # Process all documents
-        print("\n[2/5] Processing documents...")
+        print("\n[2/6] Processing documents...")
         pdf_files = list(self.research_dir.rglob("*.pdf"))
         md_files = list(self.research_dir.rglob("*.md"))
         txt_files = list(self.research_dir.rglob("*.txt"))
@@ -331,56 +1062,84 @@ class KnowledgeGraphBuilder:
         all_files = pdf_files + md_files + txt_files
         print(f"Found {len(all_files)} files ({len(pdf_files)} PDFs, {len(md_files)} MD, {len(txt_files)} TXT)")
         
+        to_ingest, file_stats = self.plan_incremental(all_files)
+        if resumed:
+            print(f"Unchanged: {len(all_files) - len(to_ingest)} files, re-indexing {len(to_ingest)}")
+        
         processed = 0
         skipped = 0
         
-        for i, filepath in enumerate(all_files):
+        # Parsing and concept extraction run in workers; merging stays in file order
+        for i, (filepath, content) in enumerate(self.iter_ingested(to_ingest)):
             if i % 10 == 0:
-                print(f"Processing {i}/{len(all_files)}...")
-            
-            # Parse based on extension
-            if filepath.suffix == '.pdf':
-                content = self.parse_pdf(filepath)
-            elif filepath.suffix in ['.md', '.txt']:
-                content = self.parse_markdown(filepath)
-            else:
-                continue
+                print(f"Processing {i}/{len(to_ingest)}...")
+            # Before the skip paths below, so skipped files still count toward a checkpoint
+            if i and i % DB_CHECKPOINT_FILES == 0:
+                self.checkpoint()
             
             if not content:
+                self.record_manifest_entry(filepath, file_stats[str(filepath)], None, None)
                 skipped += 1
                 continue
             
             # Create document node
             doc_node = self.build_document_node(filepath, content)
             if not doc_node:  # Duplicate
+                self.record_manifest_entry(filepath, file_stats[str(filepath)], content, None)
                 skipped += 1
                 continue
             
             self.add_node(doc_node)
             
             # Extract and create concept nodes
-            concepts = self.extract_concepts(content['text'], content['title'])
-            concept_nodes = self.build_concept_nodes(concepts, doc_node.id)
+            concept_nodes = self.build_concept_nodes(content['concepts'], doc_node.id,
+                                                     content.get('concept_counts'),
+                                                     content.get('concept_offsets'))
             
             for node in concept_nodes:
                 self.add_node(node)
             
+            passages = content.get('passages')
+            if passages:
+                # Workers usually ship offsets only; the text is cut here, one document at a time
+                try:
+                    if "text" in passages[0]:
+                        texts = [passage["text"] for passage in passages]
+                    else:
+                        texts = list(slice_passages(self.iter_document_text(filepath), passages))
+                except Exception as e:
+                    print(f"Error reading passages of {filepath}: {e}")
+                    texts = []
+                for node in self.build_chunk_nodes(passages, doc_node.id, texts):
+                    self.add_node(node)
+            
+            self.record_manifest_entry(filepath, file_stats[str(filepath)], content, doc_node)
             processed += 1
         
         print(f"\nProcessed: {processed} documents")
         print(f"Skipped: {skipped} (duplicates or errors)")
+        self.checkpoint()
         
         # Build concept relationships
-        print("\n[3/5] Building concept relationships...")
+        print("\n[3/6] Building concept relationships...")
         self.build_concept_relationships()
         
         # Generate embeddings (if library available)
-        print("\n[4/5] Generating embeddings...")
+        print("\n[4/6] Generating embeddings...")
         self.generate_embeddings()
+        self.generate_chunk_embeddings()
+        if self.semantic_threshold is not None:
+            self.infer_semantic_relationships(self.semantic_threshold)
+        if self.prune_floor is not None:
+            self.prune_relationships(self.prune_floor)
+        
+        # Centrality and clusters for ranking at retrieval time
+        print("\n[5/6] Analysing concept graph...")
+        self.analyze_graph()
         
-        # Export to JSON
-        print("\n[5/5] Exporting graph...")
-        self.export_to_json()
+        # Export graph files
+        print("\n[6/6] Exporting graph...")
+        self.export()
         
         print("\n" + "=" * 60)
         print("COMPLETE!")
@@ -390,66 +1149,418 @@ class KnowledgeGraphBuilder:
     
     def build_concept_relationships(self):
         """Infer relationships between concepts"""
-        # Find concept nodes
-        concepts = [n for n in self.nodes.values() if n.type == "concept"]
+        # Concept order decides edge direction (first seen -> later seen)
+        order = {n.id: i for i, n in enumerate(
+            n for n in self.nodes.values() if n.type == "concept")}
         
         # Simple co-occurrence based relationships
+        # One pass over documents, counting concept pairs that share one
         # In production: use better semantic similarity
-        for i, concept1 in enumerate(concepts):
-            for concept2 in concepts[i+1:]:
-                # Check if they appear in same documents
-                docs1 = set(r.to_id for r in self.relationships 
-                           if r.from_id == concept1.id and r.rel_type == "extracted_from")
-                docs2 = set(r.to_id for r in self.relationships 
-                           if r.from_id == concept2.id and r.rel_type == "extracted_from")
-                
-                overlap = len(docs1 & docs2)
-                if overlap > 0:
-                    strength = min(1.0, overlap / 3.0)  # Normalize
-                    rel = Relationship(
-                        from_id=concept1.id,
-                        to_id=concept2.id,
-                        rel_type="related_to",
-                        strength=strength,
-                        bidirectional=True
-                    )
-                    self.add_relationship(rel)
-    
-    @tracer.start_as_current_span("generate_embeddings")
-    def generate_embeddings(self):
+        co_occurrence: Counter = Counter()
+        for concept_ids in self.document_concepts.values():
+            ranked = sorted((c for c in concept_ids if c in order), key=order.__getitem__)
+            co_occurrence.update(combinations(ranked, 2))
+        
+        # Pruned pairs come back only with new evidence (more shared documents)
+        pruned = {}
+        for key, evidence in self.pruned_pairs.items():
+            id1, id2 = key.split("\t")
+            overlap = co_occurrence.get((id1, id2), 0) or co_occurrence.get((id2, id1), 0)
+            if overlap > evidence or overlap == 0:
+                continue  # resurrected below, or no longer a pair at all
+            pruned[key] = overlap  # fewer shared documents lowers the bar
+            co_occurrence.pop((id1, id2), None)
+            co_occurrence.pop((id2, id1), None)
+        self.pruned_pairs = pruned
+        
+        # Edges are derived from the posting index: on incremental builds drop
+        # pairs that no longer co-occur and re-score the ones that still do
+        now = datetime.now().timestamp()
+        for rel in self.relationships.of_type("related_to"):
+            pair, reverse = (rel.from_id, rel.to_id), (rel.to_id, rel.from_id)
+            if rel.metadata and rel.metadata.get("inferred") == "knn":
+                # Owned by infer_semantic_relationships unless the concepts now
+                # co-occur; then it is replaced by a co-occurrence edge below
+                if pair in co_occurrence or reverse in co_occurrence:
+                    self.relationships.remove(rel.from_id, rel.to_id, rel.rel_type)
+                continue
+            overlap = co_occurrence.pop(pair, 0) or co_occurrence.pop(reverse, 0)
+            if overlap:
+                strength = min(1.0, overlap / 3.0)
+                if strength > rel.strength:
+                    # More shared documents is a reinforcement: restart the decay clock
+                    rel.reinforcement_count += 1
+                    rel.last_reinforced = now
+                if strength != rel.strength:
+                    rel.strength = strength
+            else:
+                self.relationships.remove(rel.from_id, rel.to_id, rel.rel_type)
+        
+        for (id1, id2), overlap in sorted(
+                co_occurrence.items(), key=lambda item: (order[item[0][0]], order[item[0][1]])):
+            strength = min(1.0, overlap / 3.0)  # Normalize
+            rel = Relationship(
+                from_id=id1,
+                to_id=id2,
+                rel_type="related_to",
+                strength=strength,
+                bidirectional=True
+            )
+            self.add_relationship(rel)
+    
+    def encode_texts(self, texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE):
+        """float32 matrix of text embeddings; only texts missing from the on-disk cache are encoded"""
+        import numpy as np
+        from embedding_cache import EmbeddingCache, text_key
+        
+        keys = [text_key(t) for t in texts]
+        cache = EmbeddingCache(self.output_dir / "embedding_cache", EMBEDDING_MODEL)
+        
+        # Only texts the cache has never seen go to the model, in one batched call
+        missing: Dict[str, str] = {}
+        for text, key in zip(texts, keys):
+            if key not in missing and cache.get(key) is None:
+                missing[key] = text
+        if missing:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(EMBEDDING_MODEL)
+            vectors = model.encode(list(missing.values()), batch_size=batch_size,
+                                   convert_to_numpy=True)
+            cache.put_many(list(missing), vectors)
+            cache.save()
+        print(f"Encoded {len(missing)} new texts, {len(texts) - len(missing)} from cache")
+        
+        # One contiguous float32 matrix instead of a Python list per node
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([cache.get(key) for key in keys]).astype(np.float32, copy=False)
+    
+    @traced("generate_embeddings")
+    def generate_embeddings(self, batch_size: int = EMBEDDING_BATCH_SIZE):
         """Generate embeddings for concept nodes"""
         try:
-            from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer('all-MiniLM-L6-v2')
-            
             concepts = [n for n in self.nodes.values() if n.type == "concept"]
             print(f"Generating embeddings for {len(concepts)} concepts...")
             
+            texts = [c.data.get('name', '') + ' ' + c.data.get('definition', '') for c in concepts]
+            self.embedding_matrix = self.encode_texts(texts, batch_size)
+            self.embedding_rows = {c.id: row for row, c in enumerate(concepts)}
             for concept in concepts:
-                text = concept.data.get('name', '') + ' ' + concept.data.get('definition', '')
-                embedding = model.encode(text).tolist()
-                concept.embedding = embedding
+                concept.embedding = None
             
             print("Embeddings generated successfully")
         except Exception as e:
             print(f"Embedding generation failed (optional): {e}")
     
+    @traced("generate_chunk_embeddings")
+    def generate_chunk_embeddings(self, batch_size: int = EMBEDDING_BATCH_SIZE):
+        """Embed chunk passages into a unit-norm matrix written beside the graph and memory-mapped"""
+        chunks = [n for n in self.nodes.values() if n.type == "chunk"]
+        if not chunks:
+            return
+        try:
+            import numpy as np
+            from graph_export import CHUNK_EMBEDDINGS_NPY, CHUNK_IDS_JSON, load_embeddings, write_embeddings
+            print(f"Generating embeddings for {len(chunks)} chunks...")
+            
+            matrix = self.encode_texts([c.data["text"] for c in chunks], batch_size)
+            # Stored unit-norm so retrieval can score the mapped rows without a copy
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1.0, norms)
+            self.output_dir.mkdir(exist_ok=True)
+            write_embeddings(self.output_dir, [c.id for c in chunks], matrix,
+                             CHUNK_EMBEDDINGS_NPY, CHUNK_IDS_JSON)
+            del matrix
+            # Retrieval reads rows straight from the page cache
+            ids, self.chunk_matrix = load_embeddings(self.output_dir, mmap=True,
+                                                     matrix_name=CHUNK_EMBEDDINGS_NPY,
+                                                     ids_name=CHUNK_IDS_JSON)
+            self.chunk_rows = {chunk_id: row for row, chunk_id in enumerate(ids)}
+            print("Chunk embeddings generated successfully")
+        except Exception as e:
+            print(f"Chunk embedding generation failed (optional): {e}")
+    
+    def infer_semantic_relationships(self, threshold: float, k: int = 5, backend: str = "exact"):
+        """Add related_to edges between concepts whose embeddings are mutual kNN neighbours above threshold"""
+        if self.embedding_matrix is None or not len(self.embedding_rows):
+            print("No embeddings available, skipping semantic relationships")
+            return
+        
+        from vector_index import VectorIndex
+        index = VectorIndex.from_builder(self, backend=backend)
+        pairs = {(a, b): min(1.0, score) for a, b, score in index.knn_pairs(k, threshold)}
+        
+        # Previously inferred edges that fell below threshold are retracted
+        for rel in self.relationships.of_type("related_to"):
+            if rel.metadata and rel.metadata.get("inferred") == "knn":
+                key = (rel.from_id, rel.to_id)
+                if key not in pairs:
+                    key = (rel.to_id, rel.from_id)
+                if key in pairs:
+                    rel.strength = pairs.pop(key)
+                    rel.metadata = dict(rel.metadata, similarity=rel.strength)
+                else:
+                    self.relationships.remove(rel.from_id, rel.to_id, rel.rel_type)
+        
+        added = 0
+        for (id1, id2), score in pairs.items():
+            # Co-occurrence already links them (either direction)
+            if self.relationships.get(id1, id2, "related_to") or \
+                    self.relationships.get(id2, id1, "related_to"):
+                continue
+            self.add_relationship(Relationship(
+                from_id=id1,
+                to_id=id2,
+                rel_type="related_to",
+                strength=score,
+                bidirectional=True,
+                metadata={"inferred": "knn", "similarity": score},
+            ))
+            added += 1
+        print(f"Inferred {added} semantic relationships (k={k}, threshold={threshold})")
+    
+    def prune_relationships(self, floor: float, at: float = None,
+                            rel_types: Iterable[str] = PRUNABLE_REL_TYPES) -> int:
+        """Drop edges whose decayed strength at `at` (default now) is below floor"""
+        removed = self.relationships.prune(floor, at, None if rel_types is None else list(rel_types))
+        for record in removed:
+            if record["rel_type"] == "related_to" and not (record["metadata"] or {}).get("inferred"):
+                # Remember the evidence so the next build doesn't re-add the pair as-is
+                shared = self.concept_documents.get(record["from_id"], set()) & \
+                    self.concept_documents.get(record["to_id"], set())
+                self.pruned_pairs[f"{record['from_id']}\t{record['to_id']}"] = len(shared)
+            if record["rel_type"] == "extracted_from":
+                self.concept_documents.get(record["from_id"], set()).discard(record["to_id"])
+                self.document_concepts.get(record["to_id"], set()).discard(record["from_id"])
+        print(f"Pruned {len(removed)} relationships below strength {floor}")
+        self.relationships.compact_if_sparse()
+        return len(removed)
+    
+    def iter_relationship_records(self) -> Iterator[Dict]:
+        """
+        Relationship dicts for export. With a decay model every edge also gets
+        effective_strength, materialised in one vectorised pass at a single time.
+        """
+        if self.decay is None:
+            for rel in self.relationships:
+                yield rel.to_dict()
+            return
+        _, strengths = self.relationships.materialise_strengths(datetime.now().timestamp())
+        for rel, effective in zip(self.relationships, strengths.tolist()):
+            record = rel.to_dict()
+            record["effective_strength"] = effective
+            yield record
+    
+    @traced("analyze_graph")
+    def analyze_graph(self, node_types: Tuple[str, ...] = ("concept", "anchor")):
+        """PageRank, weighted degree and community id into node data for the concept/anchor subgraph"""
+        try:
+            from graph_analytics import analyze
+            start = time.time()
+            node_ids, scores = analyze(self, node_types)
+            pagerank = scores["pagerank"].tolist()
+            degree = scores["degree"].tolist()
+            community = scores["community"].tolist()
+            for i, node_id in enumerate(node_ids):
+                self._touch_node(node_id)
+                data = self.nodes[node_id].data
+                data["pagerank"] = pagerank[i]
+                data["weightedDegree"] = degree[i]
+                data["community"] = community[i]
+            
+            top = sorted(range(len(node_ids)), key=lambda i: -pagerank[i])[:10]
+            self.analytics = {
+                "nodes": len(node_ids),
+                "communities": (max(community) + 1) if community else 0,
+                "top_pagerank": [self.nodes[node_ids[i]].data.get("name")
+                                 or self.nodes[node_ids[i]].data.get("anchorType") for i in top],
+            }
+            print(f"Ranked {len(node_ids)} nodes into {self.analytics['communities']} communities "
+                  f"in {time.time() - start:.2f}s")
+        except Exception as e:
+            print(f"Graph analytics failed (optional): {e}")
+    
+    def get_embedding(self, node_id: str):
+        """Embedding row for a node (a view into embedding_matrix), or None"""
+        row = self.embedding_rows.get(node_id)
+        if row is None:
+            return None
+        return self.embedding_matrix[row]
+    
+    def export(self):
+        """Write the graph in the configured format(s), then stats and manifest"""
+        self.output_dir.mkdir(exist_ok=True)
+        # Reclaim tombstones from removals/pruning before the export scans
+        self.relationships.compact_if_sparse()
+        self.checkpoint()
+        print(f"\nExported to: {self.output_dir}")
+        if self.export_format in ("json", "both"):
+            self.export_to_json()
+        if self.export_format in ("jsonl", "both"):
+            self.export_to_jsonl()
+        self.remove_stale_exports()
+        self.export_delta()
+        if self.graph_db is not None:
+            # The database now holds exactly this build: the next one may diff against it
+            self.graph_db.write(meta={"export_seq": str(self.build_seq)})
+        self.export_stats()
+        
+        # Manifest last: it is only valid alongside the graph it describes
+        self.export_manifest()
+        print(f"  - manifest.json ({len(self.manifest)} files)")
+    
+    def remove_stale_exports(self):
+        """Delete snapshot files this export did not write, so no reader picks up an older graph"""
+        from graph_export import (CHUNK_EMBEDDINGS_NPY, CHUNK_IDS_JSON, EMBEDDING_IDS_JSON,
+                                  EMBEDDINGS_NPY, NODES_JSONL, RELATIONSHIPS_JSONL)
+        stale = []
+        if self.export_format == "jsonl":
+            stale += ["nodes.json", "relationships.json"]
+        if self.export_format == "json":
+            stale += [NODES_JSONL, RELATIONSHIPS_JSONL]
+        if self.export_format == "json" or self.embedding_matrix is None:
+            stale += [EMBEDDINGS_NPY, EMBEDDING_IDS_JSON]
+        if self.chunk_matrix is None:
+            # Written at embedding time, not export: absent when this build has no chunk vectors
+            stale += [CHUNK_EMBEDDINGS_NPY, CHUNK_IDS_JSON]
+        for name in stale:
+            path = self.output_dir / name
+            if path.exists():
+                path.unlink()
+                print(f"  - removed stale {name}")
+    
     def export_to_json(self):
         """Export graph to JSON files"""
-        output_dir = self.research_dir.parent / "knowledge_graph_output"
+        output_dir = self.output_dir
         output_dir.mkdir(exist_ok=True)
         
-        # Export nodes
+        # Export nodes (embeddings are expanded from the matrix here)
         nodes_data = {node_id: asdict(node) for node_id, node in self.nodes.items()}
+        for node_id, row in self.embedding_rows.items():
+            if node_id in nodes_data:
+                nodes_data[node_id]["embedding"] = self.embedding_matrix[row].tolist()
         with open(output_dir / "nodes.json", 'w') as f:
             json.dump(nodes_data, f, indent=2)
         
         # Export relationships
-        rels_data = [asdict(rel) for rel in self.relationships]
+        rels_data = list(self.iter_relationship_records())
         with open(output_dir / "relationships.json", 'w') as f:
             json.dump(rels_data, f, indent=2)
         
-        # Export summary stats
+        print(f"  - nodes.json ({len(nodes_data)} nodes)")
+        print(f"  - relationships.json ({len(rels_data)} relationships)")
+    
+    def export_to_jsonl(self):
+        """Stream nodes/relationships as JSON Lines, embeddings as an .npy sidecar"""
+        from graph_export import NODES_JSONL, RELATIONSHIPS_JSONL, write_embeddings, write_jsonl
+        
+        # Shallow per-record dicts: nothing is built for the whole graph at once.
+        # Embeddings go to the .npy sidecar, not into the node records
+        node_fields = [f.name for f in fields(Node) if f.name != "embedding"]
+        node_count = write_jsonl(self.output_dir / NODES_JSONL,
+                                 ({name: getattr(n, name) for name in node_fields}
+                                  for n in self.nodes.values()))
+        rel_count = write_jsonl(self.output_dir / RELATIONSHIPS_JSONL,
+                                self.iter_relationship_records())
+        print(f"  - {NODES_JSONL} ({node_count} nodes)")
+        print(f"  - {RELATIONSHIPS_JSONL} ({rel_count} relationships)")
+        
+        if self.embedding_matrix is not None:
+            ids = [None] * len(self.embedding_rows)
+            for node_id, row in self.embedding_rows.items():
+                ids[row] = node_id
+            write_embeddings(self.output_dir, ids, self.embedding_matrix)
+            print(f"  - embeddings.npy ({len(ids)} x {self.embedding_matrix.shape[1]})")
+    
+    def show_stats(self) -> bool:
+        """Print the stats.json of the last export; False if there is none"""
+        stats_path = self.output_dir / "stats.json"
+        if not stats_path.exists():
+            print(f"No stats found in {self.output_dir}")
+            return False
+        with open(stats_path, 'r') as f:
+            print(json.dumps(json.load(f), indent=2))
+        return True
+    
+    def _iter_delta_records(self, counts: Counter) -> Iterator[Dict]:
+        """
+        Changes against the baseline: removals (edges, then nodes) first, then
+        added/updated nodes, then added/updated edges. Leaves the baseline at
+        the current state.
+        """
+        store = self.relationships
+        for code in self._baseline_edges:
+            if not store.has_key_code(code):
+                counts["edge_remove"] += 1
+                yield {"op": "remove", "kind": "edge", "key": list(store.unpack_key(code))}
+        for node_id in self._baseline_nodes:
+            if node_id not in self.nodes:
+                counts["node_remove"] += 1
+                yield {"op": "remove", "kind": "node", "id": node_id}
+        
+        node_fields = [f.name for f in fields(Node)]
+        nodes: Dict[str, int] = {}
+        for node in self.nodes.values():
+            record = {name: getattr(node, name) for name in node_fields}
+            record["embedding"] = None  # published through the .npy sidecar
+            digest = nodes[node.id] = _record_digest(record)
+            previous = self._baseline_nodes.get(node.id)
+            if previous != digest:
+                op = "add" if previous is None else "update"
+                counts[f"node_{op}"] += 1
+                yield {"op": op, "kind": "node", "record": record}
+        
+        edges: Dict[int, int] = {}
+        for rel in store:
+            record = rel.to_dict()
+            code = store.key_code(rel)
+            digest = edges[code] = _record_digest(record)
+            previous = self._baseline_edges.get(code)
+            if previous != digest:
+                op = "add" if previous is None else "update"
+                counts[f"edge_{op}"] += 1
+                yield {"op": op, "kind": "edge", "record": record}
+        
+        self._baseline_nodes, self._baseline_edges = nodes, edges
+    
+    def export_delta(self):
+        """
+        Publish this build's changes as deltas/delta_<seq>.jsonl and advance
+        the build sequence. Without a loaded previous build there is nothing to
+        diff against, so the log restarts and consumers re-read the snapshot.
+        Only the newest max_deltas deltas are kept.
+        """
+        from graph_export import delta_path, read_delta_log, write_delta_log, write_jsonl
+        log = read_delta_log(self.output_dir)
+        self.build_seq = seq = log["seq"] + 1
+        
+        if self._baseline_nodes is None or self.max_deltas <= 0 or log["seq"] == 0:
+            for n in log["deltas"]:
+                delta_path(self.output_dir, n).unlink(missing_ok=True)
+            write_delta_log(self.output_dir, {"seq": seq, "min_seq": seq, "deltas": []})
+            # Later exports from this builder diff against this one
+            if self.max_deltas > 0:
+                self._baseline_nodes, self._baseline_edges = {}, {}
+                for _ in self._iter_delta_records(Counter()):
+                    pass
+            print(f"  - deltas/ (build {seq}: snapshot only)")
+            return
+        
+        counts: Counter = Counter()
+        header = {"seq": seq, "base_seq": seq - 1, "generated": datetime.now().isoformat()}
+        write_jsonl(delta_path(self.output_dir, seq),
+                    (record for part in ([header], self._iter_delta_records(counts)) for record in part))
+        
+        deltas = log["deltas"] + [seq]
+        # Compaction: older deltas are already reflected in the snapshot
+        while len(deltas) > self.max_deltas:
+            delta_path(self.output_dir, deltas.pop(0)).unlink(missing_ok=True)
+        write_delta_log(self.output_dir, {"seq": seq, "min_seq": deltas[0] - 1, "deltas": deltas})
+        changes = ", ".join(f"{name} {count}" for name, count in sorted(counts.items())) or "no changes"
+        print(f"  - deltas/delta_{seq:06d}.jsonl ({changes})")
+    
+    def export_stats(self):
+        """Export summary stats"""
         stats = {
             "total_nodes": len(self.nodes),
             "total_relationships": len(self.relationships),
@@ -457,36 +1568,106 @@ class KnowledgeGraphBuilder:
                 "concept": len([n for n in self.nodes.values() if n.type == "concept"]),
                 "document": len([n for n in self.nodes.values() if n.type == "document"]),
                 "anchor": len([n for n in self.nodes.values() if n.type == "anchor"]),
+                "chunk": len([n for n in self.nodes.values() if n.type == "chunk"]),
             },
             "relationship_types": {},
             "generated": datetime.now().isoformat(),
+            "build_seq": self.build_seq,
         }
+        if self.analytics:
+            stats["analytics"] = self.analytics
         
         # Count relationship types
-        for rel in self.relationships:
-            stats["relationship_types"][rel.rel_type] = \
-                stats["relationship_types"].get(rel.rel_type, 0) + 1
+        stats["relationship_types"] = self.relationships.type_counts()
         
-        with open(output_dir / "stats.json", 'w') as f:
+        with open(self.output_dir / "stats.json", 'w') as f:
             json.dump(stats, f, indent=2)
-        
-        print(f"\nExported to: {output_dir}")
-        print(f"  - nodes.json ({len(nodes_data)} nodes)")
-        print(f"  - relationships.json ({len(rels_data)} relationships)")
         print(f"  - stats.json")
 
 
+# Per-process builder used by ingestion workers
+_worker_builder: Optional[KnowledgeGraphBuilder] = None
+
+def _init_ingest_worker(research_dir: str, options: Dict, trace_endpoint: Optional[str]):
+    global _worker_builder
+    # Each worker sets up its own exporter (if tracing is on) on first use
+    telemetry.configure(trace_endpoint)
+    _worker_builder = KnowledgeGraphBuilder(research_dir, workers=1, **options)
+
+def _ingest_in_worker(filepath: Path, digest: Optional[str]) -> Optional[Dict]:
+    return _worker_builder.ingest_file(filepath, digest)
+
+
 if __name__ == "__main__":
     import sys
+    import argparse
     
-    if len(sys.argv) > 1:
-        research_dir = sys.argv[1]
-    else:
-        research_dir = os.path.expanduser("~/workspace/hughmk1/research_materials")
+    parser = argparse.ArgumentParser(description="H.U.G.H. Knowledge Graph Builder")
+    parser.add_argument("research_dir", nargs="?",
+                        default=os.path.expanduser("~/workspace/hughmk1/research_materials"))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="ingestion worker processes (default: CPU count, 1 = serial)")
+    parser.add_argument("--vocabulary", default=None,
+                        help="extra key terms, one per line ('#' comments allowed)")
+    parser.add_argument("--semantic-threshold", type=float, default=None,
+                        help="also link concepts whose embeddings are kNN neighbours above this cosine")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="json",
+                        help="json (pretty files), jsonl (streaming + embeddings.npy) or both")
+    parser.add_argument("--page-timeout", type=float, default=PDF_PAGE_TIMEOUT,
+                        help="seconds allowed per PDF page before it is skipped (0 = no limit)")
+    parser.add_argument("--no-parse-cache", action="store_true",
+                        help="always re-parse files instead of using the content-addressed cache")
+    parser.add_argument("--decay-half-life", type=float, default=None, metavar="DAYS",
+                        help="edge strength halves after this many days without reinforcement")
+    parser.add_argument("--prune-below", type=float, default=None, metavar="STRENGTH",
+                        help="drop related_to edges whose decayed strength is below this at export")
+    parser.add_argument("--db", action="store_true",
+                        help=f"checkpoint the graph to {GRAPH_DB_NAME} so interrupted builds resume; "
+                             f"graphs past --db-page-above records are served from it instead of memory")
+    parser.add_argument("--db-page-above", type=int, default=DB_PAGE_RECORDS, metavar="RECORDS",
+                        help="with --db, nodes + relationships kept in memory before paging out "
+                             "(0 = always in memory)")
+    parser.add_argument("--chunk-size", type=int, default=None, metavar="CHARS",
+                        help="also split documents into overlapping passages of this size (chunk nodes)")
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP, metavar="CHARS",
+                        help="characters shared by consecutive passages")
+    parser.add_argument("--max-deltas", type=int, default=DELTA_RETAIN, metavar="N",
+                        help="per-build delta files to keep beside the snapshot (0 = none)")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the manifest and rebuild every file from scratch")
+    parser.add_argument("--trace", nargs="?", const=telemetry.DEFAULT_ENDPOINT, default=None,
+                        metavar="ENDPOINT",
+                        help=f"export OpenTelemetry spans over OTLP/HTTP (default {telemetry.DEFAULT_ENDPOINT}; "
+                             f"also enabled by ${telemetry.ENDPOINT_ENV})")
+    parser.add_argument("--stats-only", action="store_true",
+                        help="print the stats of the last build and exit")
+    args = parser.parse_args()
+    if args.chunk_size and not 0 <= args.chunk_overlap < args.chunk_size:
+        parser.error(f"--chunk-overlap ({args.chunk_overlap}) must be at least 0 and smaller "
+                     f"than --chunk-size ({args.chunk_size})")
+    if args.trace:
+        telemetry.configure(args.trace)
     
+    research_dir = args.research_dir
     if not os.path.exists(research_dir):
         print(f"Error: Directory not found: {research_dir}")
         sys.exit(1)
     
-    builder = KnowledgeGraphBuilder(research_dir)
+    builder = KnowledgeGraphBuilder(research_dir,
+                                    workers=args.workers,
+                                    incremental=not args.full,
+                                    vocabulary=args.vocabulary,
+                                    semantic_threshold=args.semantic_threshold,
+                                    export_format=args.format,
+                                    page_timeout=args.page_timeout or None,
+                                    use_parse_cache=not args.no_parse_cache,
+                                    decay_half_life_days=args.decay_half_life,
+                                    prune_floor=args.prune_below,
+                                    use_graph_db=args.db,
+                                    chunk_chars=args.chunk_size,
+                                    chunk_overlap=args.chunk_overlap,
+                                    max_deltas=args.max_deltas,
+                                    db_page_records=args.db_page_above)
+    if args.stats_only:
+        sys.exit(0 if builder.show_stats() else 1)
     builder.process_all_documents()
@@ -14,6 +14,42 @@ export const log = mutation({
   },
 });
 
+// Batched variant used by ConvexLogger's background shipper: one round-trip
+// (and one transaction) per batch instead of per log line. Entries whose key
+// is already stored are skipped, so journal replays never duplicate logs.
+export const logBatch = mutation({
+  args: {
+    entries: v.array(
+      v.object({
+        source: v.string(),
+        level: v.string(),
+        message: v.string(),
+        context: v.optional(v.any()),
+        timestamp: v.number(),
+        key: v.optional(v.string()),
+        count: v.optional(v.number()),
+        first_timestamp: v.optional(v.number()),
+        last_timestamp: v.optional(v.number()),
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    let inserted = 0;
+    for (const entry of args.entries) {
+      if (entry.key !== undefined) {
+        const existing = await ctx.db
+          .query("logs")
+          .withIndex("by_key", (q) => q.eq("key", entry.key))
+          .first();
+        if (existing) continue;
+      }
+      await ctx.db.insert("logs", entry);
+      inserted++;
+    }
+    return inserted;
+  },
+});
+
 export const getLogs = query({
   args: {
     limit: v.optional(v.number()),
@@ -68,7 +68,14 @@ const schema = defineSchema({
     message: v.string(),
     context: v.optional(v.any()),
     timestamp: v.number(),
-  }).index("by_source_timestamp", ["source", "timestamp"]),
+    key: v.optional(v.string()), // idempotency key set by ConvexLogger
+    // Summary of a repeated message: occurrences folded into this entry
+    count: v.optional(v.number()),
+    first_timestamp: v.optional(v.number()),
+    last_timestamp: v.optional(v.number()),
+  })
+    .index("by_source_timestamp", ["source", "timestamp"])
+    .index("by_key", ["key"]),
 });
 
 export default schema;
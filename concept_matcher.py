@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Concept Matcher
+Aho-Corasick multi-pattern matching of key terms over document text
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class ConceptMatcher:
+    """
+    Compiled automaton that finds every term in a single pass over the text.
+    Matching is case-insensitive and only accepts whole-word hits, so
+    "convex" does not fire inside "convexity".
+    Offsets index into text.lower() (identical to the original text for
+    everything except a handful of exotic Unicode characters).
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        # Deduplicate while keeping the caller's order (it defines result order)
+        self.terms: List[str] = list(dict.fromkeys(
+            t.strip().lower() for t in terms if t and t.strip()))
+
+        # Trie: goto transitions, failure links, terms ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (index,)
+
+        # Breadth-first failure links; outputs inherit the suffix's matches
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @classmethod
+    def from_file(cls, path: str, extra_terms: Iterable[str] = ()) -> "ConceptMatcher":
+        """Load terms from a vocabulary file (one per line, '#' starts a comment)"""
+        terms = list(extra_terms)
+        with open(Path(path), 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    terms.append(line)
+        return cls(terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (offset, term) for every whole-word occurrence, in text order of match end"""
+        return self.iter_stream_matches((text,))
+
+    def iter_stream_matches(self, chunks: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        """
+        Same as iter_matches over the concatenation of chunks, without ever
+        joining them: automaton state and a short tail carry across chunks.
+        """
+        goto, fail, out, terms = self._goto, self._fail, self._out, self.terms
+        keep = max((len(t) for t in self.terms), default=0)
+        state = 0
+        offset = 0      # global offset of the current chunk
+        tail = ""       # last `keep` chars seen, for start-boundary checks
+        pending: List[Tuple[int, str]] = []  # hits ending on a chunk's last char
+
+        for chunk in chunks:
+            text = chunk.lower()
+            if not text:
+                continue
+            # Hits deferred from the previous chunk need this chunk's first char
+            if pending:
+                if not _is_word_char(text[0]):
+                    yield from pending
+                pending = []
+
+            window = tail + text
+            base = len(tail)
+            length = len(text)
+
+            for i, ch in enumerate(text):
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+                if not out[state]:
+                    continue
+
+                at_end = i + 1 == length
+                # Boundaries only matter where the term itself starts/ends in a word char
+                if not at_end and _is_word_char(ch) and _is_word_char(text[i + 1]):
+                    continue
+                for index in out[state]:
+                    term = terms[index]
+                    start = base + i - len(term) + 1
+                    if start and _is_word_char(term[0]) and _is_word_char(window[start - 1]):
+                        continue
+                    hit = (offset + i - len(term) + 1, term)
+                    if at_end and _is_word_char(ch):
+                        pending.append(hit)
+                    else:
+                        yield hit
+
+            offset += length
+            tail = window[-keep:] if keep else ""
+
+        yield from pending
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Map each term found to its sorted occurrence offsets, in term-list order"""
+        return self.find_all_stream((text,))
+
+    def find_all_stream(self, chunks: Iterable[str]) -> Dict[str, List[int]]:
+        """find_all over a sequence of text chunks (e.g. PDF pages)"""
+        hits: Dict[str, List[int]] = {}
+        for offset, term in self.iter_stream_matches(chunks):
+            hits.setdefault(term, []).append(offset)
+        return {term: sorted(hits[term]) for term in self.terms if term in hits}
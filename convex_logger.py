@@ -1,15 +1,349 @@
 import os
 import time
-from convex import ConvexClient
+import uuid
+import atexit
+import itertools
+import threading
+from collections import deque
+
+from log_journal import LogJournal
+
+try:
+    from convex import ConvexClient
+except ImportError:
+    ConvexClient = None
+
+# What log() does when the shipping queue is full
+OVERFLOW_POLICIES = ("drop_oldest", "block", "sample")
+
+# Directory for the outage journal (unset = failed batches are dropped)
+JOURNAL_ENV = "CONVEX_LOG_JOURNAL"
+REPLAY_RATE = 1000.0        # journal entries per second sent once Convex is back
+RETRY_INTERVAL = 1.0        # first retry after a failure; doubles up to MAX_RETRY_INTERVAL
+MAX_RETRY_INTERVAL = 60.0
+
+# Levels that always reach Convex: never rate limited or folded into summaries
+NEVER_THROTTLED = ("ERROR", "CRITICAL")
+# level (or (source, level)) -> (entries per second, burst)
+DEFAULT_RATE_LIMITS = {"DEBUG": (1.0, 10), "INFO": (5.0, 50), "WARNING": (10.0, 100)}
+DEDUP_WINDOW = 10.0         # seconds during which repeats of a message are only counted
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.burst, self.tokens + max(now - self.updated, 0.0) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class LogThrottle:
+    """
+    Decides which log entries are shipped to Convex (console output is not
+    affected). A message repeated with the same source and level within
+    dedup_window seconds is sent once; the repeats are counted and sent as a
+    single summary entry (count, first_timestamp, last_timestamp) when the
+    window closes. Other entries then pass a token bucket per (source, level).
+    NEVER_THROTTLED levels bypass both. One throttle may be shared by several
+    loggers so that a source's budget is shared too.
+    """
+
+    def __init__(self, rate_limits=DEFAULT_RATE_LIMITS, dedup_window=DEDUP_WINDOW):
+        self.rate_limits = rate_limits or {}
+        self.dedup_window = dedup_window
+        self.suppressed = 0     # dropped by a token bucket
+        self.deduplicated = 0   # folded into a summary entry
+        self._lock = threading.Lock()
+        self._buckets = {}
+        # (source, level, message) -> [window end, repeats, opening entry sent?,
+        #                              first unsent timestamp, last entry]
+        self._windows = {}
+        self._expiry = deque()  # window keys, oldest first (all windows have the same length)
+
+    def admit(self, entry):
+        """Entries to ship now: summaries of windows that have closed, then `entry` if it passes"""
+        now = entry["timestamp"]
+        with self._lock:
+            ready = self._expire(now)
+            if entry["level"] in NEVER_THROTTLED:
+                ready.append(entry)
+                return ready
+            key = (entry["source"], entry["level"], entry["message"])
+            window = self._windows.get(key)
+            if window is not None:
+                window[1] += 1
+                window[4] = entry
+                if window[3] is None:
+                    window[3] = now
+                self.deduplicated += 1
+                return ready
+            passed = self._take(entry["source"], entry["level"], now)
+            if self.dedup_window:
+                self._windows[key] = [now + self.dedup_window, 0, passed,
+                                      None if passed else now, entry]
+                self._expiry.append(key)
+            if passed:
+                ready.append(entry)
+            else:
+                self.suppressed += 1
+            return ready
+
+    def drain(self):
+        """Summaries of all open windows (flush / shutdown)"""
+        with self._lock:
+            return self._expire(float("inf"))
+
+    def _take(self, source, level, now):
+        limit = self.rate_limits.get((source, level), self.rate_limits.get(level))
+        if limit is None:
+            return True
+        bucket = self._buckets.get((source, level))
+        if bucket is None:
+            bucket = self._buckets[(source, level)] = TokenBucket(limit[0], limit[1], now)
+        return bucket.take(now)
+
+    def _expire(self, now):
+        summaries = []
+        while self._expiry and self._windows[self._expiry[0]][0] <= now:
+            window = self._windows.pop(self._expiry.popleft())
+            end, repeats, first_sent, first, last = window
+            if not repeats:
+                continue
+            if not first_sent:
+                # The opening entry was rate limited; the summary accounts for it
+                repeats += 1
+                self.suppressed -= 1
+                self.deduplicated += 1
+            summary = dict(last)
+            summary.update(count=repeats, first_timestamp=first,
+                           last_timestamp=last["timestamp"])
+            summaries.append(summary)
+        return summaries
+
+
+class LogShipper:
+    """
+    Ships log entries to Convex from a background thread. log() only appends
+    to a bounded queue; the worker sends batches through logs:logBatch when
+    batch_size entries are waiting or flush_interval seconds have passed.
+
+    With a journal, a batch that fails to send is appended to it instead of
+    being dropped, and so is every later batch until the journal has been
+    replayed (at most replay_rate entries per second), so Convex receives
+    entries in order. Entries carry idempotency keys; logs:logBatch skips
+    keys it has already stored, so re-sending after a crash is harmless.
+    """
+
+    def __init__(self, client, batch_size=100, flush_interval=1.0, max_queue=10000,
+                 overflow="drop_oldest", sample_every=10, journal=None,
+                 replay_rate=REPLAY_RATE):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        # "sample": while full, 1 in sample_every new entries replaces the oldest
+        self.sample_every = sample_every
+        self.journal = journal
+        self.replay_rate = replay_rate
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self.spilled = 0
+
+        self._queue = deque()
+        self._in_flight = 0
+        self._overflowed = 0
+        self._closed = False
+        self._urgent = False    # flush() pending: send partial batches immediately
+        self._retry_interval = RETRY_INTERVAL
+        self._replay_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)    # worker: entries waiting / closing
+        self._space = threading.Condition(self._lock)   # "block" callers: room in queue
+        self._idle = threading.Condition(self._lock)    # flush(): queue drained
+        self._thread = threading.Thread(target=self._run, name="convex-log-shipper", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, entry):
+        """Queue one entry; returns False if it was dropped"""
+        with self._lock:
+            if self._closed:
+                return False
+            if len(self._queue) >= self.max_queue and not self._make_room():
+                self.dropped += 1
+                return False
+            self._queue.append(entry)
+            if len(self._queue) >= self.batch_size:
+                self._wake.notify()
+            return True
+
+    def _make_room(self):
+        """Apply the overflow policy (lock held); True if the new entry may be queued"""
+        if self.overflow == "block":
+            while len(self._queue) >= self.max_queue and not self._closed:
+                self._space.wait()
+            return not self._closed
+        if self.overflow == "sample":
+            self._overflowed += 1
+            if self._overflowed % self.sample_every:
+                return False
+        self._queue.popleft()
+        self.dropped += 1
+        return True
+
+    def _replaying(self):
+        return self.journal is not None and self.journal.pending()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                # Wait for a full batch, the flush interval, flush() or close()
+                deadline = time.monotonic() + self.flush_interval
+                if self._replaying():
+                    deadline = min(deadline, self._replay_at)
+                while len(self._queue) < self.batch_size and not (self._closed or self._urgent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+                if not self._queue:
+                    self._urgent = False
+                    self._idle.notify_all()
+                    if self._closed:
+                        # Whatever is still journaled is replayed by the next run
+                        if self.journal is not None:
+                            self.journal.close()
+                        return
+                    if not self._replaying():
+                        continue
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                self._space.notify_all()
+            if batch:
+                self._ship(batch)
+            if self._replaying():
+                self._replay()
+            with self._lock:
+                self._in_flight = 0
+                if not self._queue:
+                    self._urgent = False
+                    self._idle.notify_all()
+
+    def _ship(self, batch):
+        if self._replaying():
+            # Older entries are still on disk; queue behind them to keep order
+            self._spill(batch)
+            return
+        try:
+            self.client.mutation("logs:logBatch", {"entries": batch})
+            self.sent += len(batch)
+        except Exception as e:
+            if self.journal is None:
+                self.failed += len(batch)
+                print(f"❌ Failed to send {len(batch)} logs to Convex: {e}")
+                return
+            print(f"⚠️ Convex unreachable, journaling logs to {self.journal.dir}: {e}")
+            self._spill(batch)
+            self._retry_interval = RETRY_INTERVAL
+            self._replay_at = time.monotonic() + self._retry_interval
+
+    def _spill(self, batch):
+        try:
+            self.journal.append(batch)
+            self.spilled += len(batch)
+        except OSError as e:
+            self.failed += len(batch)
+            print(f"❌ Failed to journal {len(batch)} logs: {e}")
+
+    def _replay(self):
+        """Send the oldest journaled batch if the rate limit and retry backoff allow"""
+        now = time.monotonic()
+        if now < self._replay_at:
+            return
+        entries = self.journal.read(self.batch_size)
+        try:
+            if entries:
+                self.client.mutation("logs:logBatch", {"entries": entries})
+        except Exception:
+            self._retry_interval = min(self._retry_interval * 2, MAX_RETRY_INTERVAL)
+            self._replay_at = now + self._retry_interval
+            return
+        self.journal.commit()
+        self.sent += len(entries)
+        self._retry_interval = RETRY_INTERVAL
+        self._replay_at = now + len(entries) / self.replay_rate
+        if not self.journal.pending():
+            print("✅ Convex reachable again, journaled logs replayed")
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is sent or journaled (or timeout); True if drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            # Partial batches go out without waiting for the interval
+            self._urgent = True
+            self._wake.notify()
+            while self._queue or self._in_flight:
+                if not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def close(self, timeout=5.0):
+        """Send (or journal) what is queued, then stop the worker (registered with atexit)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify_all()
+            self._space.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
 
 class ConvexLogger:
-    def __init__(self, source="unknown"):
+    def __init__(self, source="unknown", batch_size=100, flush_interval=1.0,
+                 max_queue=10000, overflow="drop_oldest", journal_dir=None,
+                 throttle=None):
         self.url = os.getenv("CONVEX_URL")
         self.source = source
         self.client = None
+        self.shipper = None
+        # Pass LogThrottle(rate_limits=None, dedup_window=None) to ship every entry
+        self.throttle = throttle if throttle is not None else LogThrottle()
+        # Idempotency keys: unique per process, stable across journal replays
+        self._key_prefix = uuid.uuid4().hex
+        self._seq = itertools.count()
+        journal_dir = journal_dir or os.getenv(JOURNAL_ENV)
         if self.url:
             try:
+                if ConvexClient is None:
+                    raise ImportError("the convex package is not installed")
                 self.client = ConvexClient(self.url)
+                journal = LogJournal(journal_dir) if journal_dir else None
+                self.shipper = LogShipper(self.client, batch_size=batch_size,
+                                          flush_interval=flush_interval,
+                                          max_queue=max_queue, overflow=overflow,
+                                          journal=journal)
+                # Registered after the shipper's own hook, so this runs first and
+                # pending repeat summaries are queued before the shipper stops
+                atexit.register(self.close)
             except Exception as e:
                 print(f"⚠️ Failed to initialize Convex client: {e}")
         else:
@@ -18,28 +352,43 @@ class ConvexLogger:
 
     def log(self, level, message, context=None):
         timestamp = time.time()
-        
+
         # Console output
         print(f"[{self.source}] [{level}] {message}")
-        
-        # Convex output
-        if self.client:
-            try:
-                self.client.mutation("logs:log", {
-                    "source": self.source,
-                    "level": level,
-                    "message": message,
-                    "context": context,
-                    "timestamp": timestamp
-                })
-            except Exception as e:
-                print(f"❌ Failed to send log to Convex: {e}")
+
+        # Convex output (throttled, queued; sent in batches by the shipper thread)
+        if self.shipper:
+            self._submit(self.throttle.admit({
+                "source": self.source,
+                "level": level,
+                "message": message,
+                "context": context,
+                "timestamp": timestamp
+            }))
+
+    def _submit(self, entries):
+        for entry in entries:
+            entry["key"] = f"{self._key_prefix}-{next(self._seq)}"
+            self.shipper.submit(entry)
+
+    def flush(self, timeout=None):
+        """Block until queued logs (and pending repeat summaries) have been sent to Convex"""
+        if not self.shipper:
+            return True
+        self._submit(self.throttle.drain())
+        return self.shipper.flush(timeout)
+
+    def close(self):
+        if self.shipper:
+            self._submit(self.throttle.drain())
+            self.shipper.close()
+            atexit.unregister(self.close)
 
     def info(self, message, context=None):
         self.log("INFO", message, context)
 
     def error(self, message, context=None):
         self.log("ERROR", message, context)
-        
+
     def warning(self, message, context=None):
         self.log("WARNING", message, context)
@@ -0,0 +1,163 @@
+import ast
+import math
+import operator
+from dataclasses import dataclass, make_dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+@dataclass
+class ChannelSpec:
+    name: str
+    decay: float           # fraction retained per second, 0 < decay <= 1
+    baseline: float        # level the channel decays toward
+    low: float = 0.0       # clamp range
+    high: float = 1.0
+    abbrev: Optional[str] = None  # short label for logs (default: the full name)
+
+    @property
+    def label(self) -> str:
+        return self.abbrev or self.name
+
+@dataclass
+class FlagRule:
+    name: str
+    expression: str        # e.g. "cortisol > 0.9", "0.4 <= dopamine <= 0.6 and ..."
+
+_COMPARISONS = {
+    ast.Gt: np.greater, ast.GtE: np.greater_equal,
+    ast.Lt: np.less, ast.LtE: np.less_equal,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+_ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+               ast.Div: operator.truediv}
+
+def compile_rule(expression: str, channels: Sequence[str]) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Compile a threshold expression over channel names into a function of
+    channel-major levels (K, N) -> (N,) bool. Supports comparisons (chained),
+    and / or / not, parentheses, + - * / and numeric constants.
+    """
+    index = {name: i for i, name in enumerate(channels)}
+
+    def build(node):
+        if isinstance(node, ast.Expression):
+            return build(node.body)
+        if isinstance(node, ast.Name):
+            if node.id not in index:
+                raise ValueError(f"Unknown channel '{node.id}' in flag rule: {expression}")
+            i = index[node.id]
+            return lambda levels: levels[i]
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda levels: value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = build(node.operand)
+            return lambda levels: -operand(levels)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = build(node.operand)
+            return lambda levels: np.logical_not(operand(levels))
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            op, left, right = _ARITHMETIC[type(node.op)], build(node.left), build(node.right)
+            return lambda levels: op(left(levels), right(levels))
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            parts = [build(value) for value in node.values]
+            return lambda levels: combine.reduce([part(levels) for part in parts])
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            terms = [build(node.left)] + [build(c) for c in node.comparators]
+            ops = [_COMPARISONS[type(op)] for op in node.ops]
+            if len(ops) == 1:
+                op, left, right = ops[0], terms[0], terms[1]
+                return lambda levels: op(left(levels), right(levels))
+            # a < b < c  ->  (a < b) and (b < c)
+            pairs = list(zip(ops, terms, terms[1:]))
+            return lambda levels: np.logical_and.reduce(
+                [op(left(levels), right(levels)) for op, left, right in pairs])
+        raise ValueError(f"Unsupported syntax in flag rule: {expression}")
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid flag rule: {expression}") from e
+    evaluate = build(tree)
+    return lambda levels: np.broadcast_to(evaluate(levels), levels.shape[1:])
+
+class ChannelRegistry:
+    """
+    The neurotransmitter channels and emotional flags an engine simulates.
+    Per-channel constants are precomputed as arrays in registration order
+    (baseline, ln(decay), clamp bounds) so the engine's update is one
+    vector operation per step whatever the channel count; flag rules are
+    compiled once to NumPy functions.
+    """
+
+    def __init__(self, channels: Sequence[ChannelSpec] = (), flags: Sequence[FlagRule] = (),
+                 state_type: Optional[type] = None, flags_type: Optional[type] = None):
+        self.channels: List[ChannelSpec] = []
+        self.flags: List[FlagRule] = []
+        self._compile()
+        for spec in channels:
+            self.add_channel(spec)
+        for rule in flags:
+            self.add_flag(rule)
+        # Explicit types apply to the initial layout; registering more resets them
+        self._state_type = state_type
+        self._flags_type = flags_type
+
+    def add_channel(self, spec: ChannelSpec):
+        if spec.name in self.channel_names:
+            raise ValueError(f"Duplicate channel: {spec.name}")
+        if not 0.0 < spec.decay <= 1.0:
+            raise ValueError(f"Decay for {spec.name} must be in (0, 1], got {spec.decay}")
+        if not spec.low <= spec.baseline <= spec.high:
+            raise ValueError(f"Baseline for {spec.name} outside its clamp range")
+        if spec.label in {other.label for other in self.channels}:
+            raise ValueError(f"Duplicate channel label: {spec.label}")
+        self.channels.append(spec)
+        self._state_type = None
+        self._compile()
+
+    def add_flag(self, rule: FlagRule):
+        if rule.name in self.flag_names:
+            raise ValueError(f"Duplicate flag: {rule.name}")
+        self.flags.append(rule)
+        self._flags_type = None
+        self._compile()
+
+    def _compile(self):
+        self.channel_names = tuple(spec.name for spec in self.channels)
+        self.flag_names = tuple(rule.name for rule in self.flags)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.channel_names)}
+        self.baseline = np.array([spec.baseline for spec in self.channels])
+        self.log_decay = np.array([math.log(spec.decay) for spec in self.channels])
+        self.low = np.array([spec.low for spec in self.channels])
+        self.high = np.array([spec.high for spec in self.channels])
+        self.rules = [compile_rule(rule.expression, self.channel_names) for rule in self.flags]
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    @property
+    def state_type(self) -> type:
+        """Dataclass with one float field per channel plus last_updated"""
+        if self._state_type is None:
+            fields = [(name, float, 0.0) for name in self.channel_names] + [("last_updated", float, 0.0)]
+            self._state_type = make_dataclass("NeurotransmitterState", fields)
+        return self._state_type
+
+    @property
+    def flags_type(self) -> type:
+        """Dataclass with one bool field per flag"""
+        if self._flags_type is None:
+            self._flags_type = make_dataclass("EmotionalFlags",
+                                              [(name, bool, False) for name in self.flag_names])
+        return self._flags_type
+
+    def evaluate(self, levels: np.ndarray) -> np.ndarray:
+        """(F, N) flags from channel-major levels (K, N)"""
+        flags = np.empty((len(self.rules), levels.shape[1]), dtype=bool)
+        for row, rule in zip(flags, self.rules):
+            row[...] = rule(levels)
+        return flags
@@ -2,6 +2,10 @@ import time
 from dataclasses import dataclass
 from typing import Optional, Dict
 
+import numpy as np
+
+from channels import ChannelRegistry, ChannelSpec, FlagRule
+
 @dataclass
 class NeurotransmitterState:
     dopamine: float = 0.5
@@ -16,60 +20,213 @@ class EmotionalFlags:
     emotional_instability: bool = False  # Serotonin < 0.3
     balanced_state: bool = False         # All in [0.4, 0.6]
 
+# The psyche's channels (decay per second, baseline, clamp range) and flags.
+# Add a ChannelSpec / FlagRule here, or pass engines a registry of your own.
+DEFAULT_REGISTRY = ChannelRegistry(
+    channels=[
+        ChannelSpec("dopamine", decay=0.999, baseline=0.5, abbrev="D"),
+        ChannelSpec("serotonin", decay=0.9995, baseline=0.5, abbrev="S"),
+        ChannelSpec("cortisol", decay=0.998, baseline=0.5, abbrev="C"),
+    ],
+    flags=[
+        FlagRule("defensive_posture", "cortisol > 0.9"),
+        FlagRule("high_motivation", "dopamine > 0.8"),
+        FlagRule("emotional_instability", "serotonin < 0.3"),
+        FlagRule("balanced_state", "0.4 <= dopamine <= 0.6 and 0.4 <= serotonin <= 0.6 "
+                                   "and 0.4 <= cortisol <= 0.6"),
+    ],
+    state_type=NeurotransmitterState,
+    flags_type=EmotionalFlags,
+)
+
 class NeurotransmitterEngine:
     """
     The Silent DPM - Mathematical emotion engine.
     Implements: E_t = E_{t-1} * δ + I_t
+
+    A thin view of one row of a BatchNeurotransmitterEngine. Engines created
+    without a batch get a private single-agent batch over `registry`.
     """
-    
-    # Decay constants (per second)
-    DOPAMINE_DECAY = 0.999
-    SEROTONIN_DECAY = 0.9995
-    CORTISOL_DECAY = 0.998
-    
-    # Baselines
-    DOPAMINE_BASELINE = 0.5
-    SEROTONIN_BASELINE = 0.5
-    CORTISOL_BASELINE = 0.5
-
-    def __init__(self):
-        self.state = NeurotransmitterState(last_updated=time.time())
-
-    def update(self, stimulus: Dict[str, float] = None) -> EmotionalFlags:
-        now = time.time()
-        dt = now - self.state.last_updated
-        
-        # Apply decay
-        self.state.dopamine = self._decay(self.state.dopamine, self.DOPAMINE_BASELINE, self.DOPAMINE_DECAY, dt)
-        self.state.serotonin = self._decay(self.state.serotonin, self.SEROTONIN_BASELINE, self.SEROTONIN_DECAY, dt)
-        self.state.cortisol = self._decay(self.state.cortisol, self.CORTISOL_BASELINE, self.CORTISOL_DECAY, dt)
-        
-        # Apply stimulus
+
+    def __init__(self, batch: Optional["BatchNeurotransmitterEngine"] = None,
+                 index: Optional[int] = None, registry: Optional[ChannelRegistry] = None):
+        if batch is None:
+            batch = BatchNeurotransmitterEngine(1, registry=registry)
+            index = 0
+        elif index is None:
+            index = batch.add_agents(1).start
+        self.batch = batch
+        self.index = index
+        self.registry = batch.registry
+        self.state = AgentState(batch, index)
+
+    def update(self, stimulus: Dict[str, float] = None):
+        """
+        Decay to now, apply the stimulus; returns the registry's flags dataclass.
+        Stimulus keys that are not channels are ignored.
+        """
         if stimulus:
-            self.state.dopamine += stimulus.get('dopamine', 0.0)
-            self.state.serotonin += stimulus.get('serotonin', 0.0)
-            self.state.cortisol += stimulus.get('cortisol', 0.0)
-            
-        # Clamp values [0.0, 1.0]
-        self.state.dopamine = max(0.0, min(1.0, self.state.dopamine))
-        self.state.serotonin = max(0.0, min(1.0, self.state.serotonin))
-        self.state.cortisol = max(0.0, min(1.0, self.state.cortisol))
-        
-        self.state.last_updated = now
-        return self._evaluate_flags()
-
-    def _decay(self, current: float, baseline: float, decay_rate: float, dt: float) -> float:
-        factor = decay_rate ** dt
-        return current * factor + baseline * (1.0 - factor)
-
-    def _evaluate_flags(self) -> EmotionalFlags:
-        return EmotionalFlags(
-            defensive_posture=(self.state.cortisol > 0.9),
-            high_motivation=(self.state.dopamine > 0.8),
-            emotional_instability=(self.state.serotonin < 0.3),
-            balanced_state=(
-                0.4 <= self.state.dopamine <= 0.6 and
-                0.4 <= self.state.serotonin <= 0.6 and
-                0.4 <= self.state.cortisol <= 0.6
-            )
-        )
+            channels = self.registry.index
+            stimulus = {name: value for name, value in stimulus.items() if name in channels}
+        flags = self.batch.update(stimulus, agents=slice(self.index, self.index + 1))
+        return self.registry.flags_type(*flags[0].tolist())
+
+    def _evaluate_flags(self):
+        flags = self.batch.evaluate_flags(slice(self.index, self.index + 1))
+        return self.registry.flags_type(*flags[0].tolist())
+
+class AgentState:
+    """
+    Live view of one agent's levels: one attribute per registry channel plus
+    last_updated; reads and writes go to the batch arrays
+    """
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "BatchNeurotransmitterEngine", index: int):
+        object.__setattr__(self, "_batch", batch)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name: str) -> float:
+        channel = self._batch.registry.index.get(name)
+        if channel is None:
+            raise AttributeError(name)
+        return float(self._batch.levels[self._index, channel])
+
+    def __setattr__(self, name: str, value: float):
+        channel = self._batch.registry.index.get(name)
+        if channel is None:
+            object.__setattr__(self, name, value)  # last_updated, or AttributeError
+            return
+        self._batch.levels[self._index, channel] = value
+
+    @property
+    def last_updated(self) -> float:
+        return float(self._batch.last_updated[self._index])
+
+    @last_updated.setter
+    def last_updated(self, value: float):
+        self._batch.last_updated[self._index] = value
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(self._batch.registry.channel_names, self._batch.levels[self._index].tolist()))
+
+    def snapshot(self):
+        """Copy as the registry's state dataclass (NeurotransmitterState by default)"""
+        return self._batch.registry.state_type(*self._batch.levels[self._index].tolist(),
+                                               last_updated=self.last_updated)
+
+class BatchNeurotransmitterEngine:
+    """
+    N agents x K channels in NumPy arrays. One update() decays every agent
+    toward the baselines (E = B + (E - B) * δ^dt, with δ^dt = exp(dt * ln δ)),
+    adds the stimulus, clamps to [0, 1] and evaluates the flags, all as whole-
+    array operations. Agents are rows; add_agents() grows capacity by doubling.
+    Channels, their constants and the flag rules come from a ChannelRegistry,
+    which should not change once engines use it.
+
+    Levels are stored channel-major (K x capacity) so every per-channel
+    operation runs over contiguous memory; `levels` is the (N, K) view.
+    """
+
+    def __init__(self, n_agents: int = 0, now: Optional[float] = None,
+                 registry: Optional[ChannelRegistry] = None):
+        self.registry = registry = registry or DEFAULT_REGISTRY
+        self.channels = registry.channel_names
+        self.flags = registry.flag_names
+        self.baseline = registry.baseline[:, None]
+        self.log_decay = registry.log_decay
+        if (registry.low == 0.0).all() and (registry.high == 1.0).all():
+            self._clamp = (0.0, 1.0)  # scalar bounds clip faster than per-channel ones
+        else:
+            self._clamp = (registry.low[:, None], registry.high[:, None])
+        self._n = 0
+        self._levels = np.empty((len(self.channels), 0))
+        self._last_updated = np.empty(0)
+        if n_agents:
+            self.add_agents(n_agents, now)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def levels(self) -> np.ndarray:
+        """(N, K) view of the current levels, columns in registry channel order"""
+        return self._levels[:, :self._n].T
+
+    @property
+    def last_updated(self) -> np.ndarray:
+        return self._last_updated[:self._n]
+
+    def add_agents(self, count: int, now: Optional[float] = None) -> range:
+        """Append agents at baseline; returns their row indices"""
+        start, end = self._n, self._n + count
+        if end > self._levels.shape[1]:
+            capacity = max(end, 2 * self._levels.shape[1])
+            levels = np.empty((len(self.channels), capacity))
+            levels[:, :start] = self._levels[:, :start]
+            last_updated = np.empty(capacity)
+            last_updated[:start] = self._last_updated[:start]
+            self._levels, self._last_updated = levels, last_updated
+        self._levels[:, start:end] = self.baseline
+        self._last_updated[start:end] = time.time() if now is None else now
+        self._n = end
+        return range(start, end)
+
+    def channel(self, name: str) -> int:
+        index = self.registry.index.get(name)
+        if index is None:
+            raise ValueError(f"Unknown channel: {name} (expected one of {', '.join(self.channels)})")
+        return index
+
+    def update(self, stimulus=None, now: Optional[float] = None, agents=None) -> np.ndarray:
+        """
+        Advance agents (all, the given row indices or a slice) to `now`. The stimulus
+        is a {channel: scalar or per-agent array} dict (unknown channels raise
+        ValueError), or an array that broadcasts to (agents, K).
+        Returns the (agents, F) flag matrix.
+        """
+        now = time.time() if now is None else now
+        by_channel = None
+        if isinstance(stimulus, dict):
+            # Resolved before any state changes, so a bad key leaves agents untouched
+            by_channel = [(self.channel(name), value) for name, value in stimulus.items()]
+            stimulus = None
+        if agents is None:
+            agents = slice(0, self._n)
+        elif not isinstance(agents, slice):
+            agents = np.asarray(agents, dtype=np.intp)
+        # Slices give views that are updated in place; index arrays give copies
+        levels, last_updated = self._levels[:, agents], self._last_updated[agents]
+
+        if len(last_updated) and (last_updated == last_updated[0]).all():
+            # Agents ticked together share dt: one δ^dt per channel
+            factor = np.exp((now - last_updated[0]) * self.log_decay)[:, None]
+        else:
+            factor = np.exp(np.multiply.outer(self.log_decay, now - last_updated))
+        levels -= self.baseline
+        levels *= factor
+        levels += self.baseline
+        if by_channel:
+            for channel, value in by_channel:
+                levels[channel] += value
+        elif stimulus is not None:
+            stimulus = np.asarray(stimulus, dtype=float)
+            levels += stimulus[:, None] if stimulus.ndim == 1 else stimulus.T
+        np.clip(levels, *self._clamp, out=levels)
+
+        if not isinstance(agents, slice):
+            self._levels[:, agents] = levels
+        self._last_updated[agents] = now
+        return self._compute_flags(levels)
+
+    def evaluate_flags(self, agents=None) -> np.ndarray:
+        if agents is None:
+            agents = slice(0, self._n)
+        elif not isinstance(agents, slice):
+            agents = np.asarray(agents, dtype=np.intp)
+        return self._compute_flags(self._levels[:, agents])
+
+    def _compute_flags(self, levels: np.ndarray) -> np.ndarray:
+        """(N, F) flags, columns in registry flag order, from channel-major levels"""
+        return self.registry.evaluate(levels).T
@@ -9,6 +9,10 @@ from emergence_gate import EmergenceGate, GateState
 CONVEX_URL = os.getenv("CONVEX_URL", "https://mild-gnu-96.convex.cloud")
 UPDATE_INTERVAL = 1.0  # Seconds
 MAX_MUTATION_RETRIES = 5  # retry attempts for server errors
+# Fields the psyche:updateState validator accepts; other registry channels and
+# flags stay local until the Convex mutation and schema are extended
+CONVEX_CHANNELS = ("dopamine", "serotonin", "cortisol")
+CONVEX_FLAGS = ("defensive_posture", "high_motivation", "emotional_instability", "balanced_state")
 
 
 def main():
@@ -71,18 +75,10 @@ def main():
                 # Just decay
                 flags = psyche.update({})
             
-            # Access current state
-            current_state = {
-                'dopamine': psyche.state.dopamine,
-                'serotonin': psyche.state.serotonin,
-                'cortisol': psyche.state.cortisol,
-                'flags': {
-                    'defensive_posture': flags.defensive_posture,
-                    'high_motivation': flags.high_motivation,
-                    'emotional_instability': flags.emotional_instability,
-                    'balanced_state': flags.balanced_state
-                }
-            }
+            # Access current state (every channel and flag in the engine's registry)
+            current_state = psyche.state.as_dict()
+            current_state['flags'] = {name: getattr(flags, name)
+                                      for name in psyche.registry.flag_names}
             
             # 2. Check Gate - simple policy: lock on high cortisol, unlock on calm
             try:
@@ -96,12 +92,9 @@ def main():
             gate_status_str = gate.current_state.value
             
             # 3. Push to Convex (best-effort, errors logged)
-            success = send_mutation_with_retry(client, "psyche:updateState", {
-                "dopamine": current_state['dopamine'],
-                "serotonin": current_state['serotonin'],
-                "cortisol": current_state['cortisol'],
-                "flags": current_state['flags'],
-            })
+            payload = {name: current_state[name] for name in CONVEX_CHANNELS}
+            payload['flags'] = {name: current_state['flags'][name] for name in CONVEX_FLAGS}
+            success = send_mutation_with_retry(client, "psyche:updateState", payload)
             if not success:
                 print("Failed to send psyche state after retries")
             
@@ -115,7 +108,9 @@ def main():
                 print("Failed to send gate state after retries")
             
             # Log heartbeat
-            print(f"HEARTBEAT | D:{current_state['dopamine']:.2f} S:{current_state['serotonin']:.2f} C:{current_state['cortisol']:.2f} | GATE: {gate_status_str}")
+            levels = " ".join(f"{spec.label}:{current_state[spec.name]:.2f}"
+                              for spec in psyche.registry.channels)
+            print(f"HEARTBEAT | {levels} | GATE: {gate_status_str}")
             
             time.sleep(UPDATE_INTERVAL)
             
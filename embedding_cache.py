@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Embedding Cache
+On-disk store of text embeddings keyed by model name and text hash
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    One directory per model holding a float32 matrix (vectors.npy) and the
+    text hash of each row (keys.json). Loaded whole, appended on save.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str):
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+        self.dir = Path(cache_dir) / safe_name
+        self.model_name = model_name
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._pending_keys: List[str] = []
+        self._pending: List[np.ndarray] = []
+        self._load()
+
+    def _load(self):
+        keys_path = self.dir / "keys.json"
+        vectors_path = self.dir / "vectors.npy"
+        if not (keys_path.exists() and vectors_path.exists()):
+            return
+        try:
+            with open(keys_path, 'r') as f:
+                keys = json.load(f)
+            vectors = np.load(vectors_path)
+            if len(keys) != len(vectors):
+                raise ValueError("keys/vectors length mismatch")
+        except Exception as e:
+            print(f"Ignoring unreadable embedding cache {self.dir}: {e}")
+            return
+        self._vectors = vectors.astype(np.float32, copy=False)
+        self._rows = {key: i for i, key in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._pending_keys)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return self._vectors[row]
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Queue freshly encoded vectors; written out by save()"""
+        for key, vector in zip(keys, vectors):
+            if key not in self._rows:
+                self._pending_keys.append(key)
+                self._pending.append(np.asarray(vector, dtype=np.float32))
+
+    def save(self):
+        if not self._pending_keys:
+            return
+        pending = np.vstack(self._pending)
+        if self._vectors is None:
+            vectors = pending
+        else:
+            vectors = np.vstack([self._vectors, pending])
+        keys = [None] * len(self._rows)
+        for key, row in self._rows.items():
+            keys[row] = key
+        keys.extend(self._pending_keys)
+
+        # Write to temp files and swap in, so a crash never leaves a torn cache
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.dir / "vectors.tmp.npy"
+        tmp_keys = self.dir / "keys.tmp.json"
+        np.save(tmp_vectors, vectors)
+        with open(tmp_keys, 'w') as f:
+            json.dump(keys, f)
+        os.replace(tmp_vectors, self.dir / "vectors.npy")
+        os.replace(tmp_keys, self.dir / "keys.json")
+
+        self._vectors = vectors
+        self._rows = {key: i for i, key in enumerate(keys)}
+        self._pending_keys = []
+        self._pending = []
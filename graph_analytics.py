@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Graph Analytics
+PageRank and community detection over a node-type subgraph, on CSR arrays
+(indptr / indices / weights) with NumPy; no per-edge Python loops
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITER = 100
+LABEL_PROPAGATION_MAX_ITER = 20
+
+
+def csr_from_edges(n: int, src, dst, weights, symmetric: bool = True):
+    """
+    (indptr, indices, weights) for an n-node graph. With symmetric=True every
+    edge is stored in both directions; parallel edges are summed.
+    """
+    import numpy as np
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if symmetric:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        weights = np.concatenate([weights, weights])
+
+    # Merge duplicate (src, dst) pairs, which also sorts edges by row
+    keys, inverse = np.unique(src * n + dst, return_inverse=True)
+    summed = np.bincount(inverse, weights=weights, minlength=len(keys))
+    rows, cols = keys // n, keys % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols, summed
+
+
+def _row_ids(indptr):
+    import numpy as np
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def pagerank(indptr, indices, weights, damping: float = PAGERANK_DAMPING,
+             tol: float = PAGERANK_TOLERANCE, max_iter: int = PAGERANK_MAX_ITER):
+    """
+    Weighted PageRank by power iteration. Rank flows along each row's edges in
+    proportion to weight; nodes without edges spread theirs uniformly.
+    Returns (scores summing to 1, iterations used).
+    """
+    import numpy as np
+    n = len(indptr) - 1
+    if n == 0:
+        return np.zeros(0), 0
+    rows = _row_ids(indptr)
+    out_weight = np.bincount(rows, weights=weights, minlength=n)
+    dangling = out_weight == 0
+    # Transition probability of each stored edge, computed once
+    share = weights / np.where(dangling, 1.0, out_weight)[rows]
+
+    rank = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iter + 1):
+        flow = np.bincount(indices, weights=share * rank[rows], minlength=n)
+        new_rank = damping * (flow + rank[dangling].sum() / n) + (1.0 - damping) / n
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            break
+    return rank / rank.sum(), iteration
+
+
+def label_propagation(indptr, indices, weights, max_iter: int = LABEL_PROPAGATION_MAX_ITER):
+    """
+    Weighted label propagation: each node repeatedly takes the label with the
+    most incident weight (ties keep the current label, then the smallest).
+    Returns community ids numbered by size, largest first.
+    """
+    import numpy as np
+    n = len(indptr) - 1
+    labels = np.arange(n)
+    if n == 0:
+        return labels
+    rows = _row_ids(indptr)
+    # A small self-vote keeps a node's label on ties and damps oscillation
+    self_vote = 1e-9 * (np.bincount(rows, weights=weights, minlength=n) + 1.0)
+    vote_rows = np.concatenate([rows, np.arange(n)])
+
+    for _ in range(max_iter):
+        vote_labels = np.concatenate([labels[indices], labels])
+        vote_weights = np.concatenate([weights, self_vote])
+        keys, inverse = np.unique(vote_rows * n + vote_labels, return_inverse=True)
+        totals = np.bincount(inverse, weights=vote_weights, minlength=len(keys))
+        key_rows, key_labels = keys // n, keys % n
+        # Per row: highest total wins, smallest label on ties (lexsort is stable)
+        order = np.lexsort((key_labels, -totals, key_rows))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = key_rows[order][1:] != key_rows[order][:-1]
+        winners = order[first]
+        new_labels = labels.copy()
+        new_labels[key_rows[winners]] = key_labels[winners]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    _, dense, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+    rank_by_size = np.empty(len(sizes), dtype=np.int64)
+    rank_by_size[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    return rank_by_size[dense]
+
+
+def analyze(builder, node_types: Iterable[str] = ("concept", "anchor"),
+            at: float = None) -> Tuple[List[str], Dict[str, object]]:
+    """
+    PageRank, weighted degree and communities for the subgraph induced by the
+    given node types. Edges are treated as undirected and weighted by strength
+    (decayed to `at` when the store has a decay model).
+    Returns (node ids, {"pagerank", "degree", "community": arrays aligned with ids}).
+    """
+    import numpy as np
+    wanted = set(node_types)
+    node_ids = [node_id for node_id, node in builder.nodes.items() if node.type in wanted]
+    store = builder.relationships
+
+    # Store node code -> subgraph position (-1 = outside the subgraph)
+    position = np.full(len(store.node_ids), -1, dtype=np.int64)
+    for i, node_id in enumerate(node_ids):
+        code = store.node_ids.lookup(node_id)
+        if code is not None:
+            position[code] = i
+
+    if store.decay is not None and at is None:
+        import time
+        at = time.time()
+    _, from_codes, to_codes, _, strengths = store.edge_columns(at)
+    src, dst = position[from_codes], position[to_codes]
+    keep = (src >= 0) & (dst >= 0) & (src != dst) & (strengths > 0)
+
+    indptr, indices, weights = csr_from_edges(len(node_ids), src[keep], dst[keep], strengths[keep])
+    scores, _ = pagerank(indptr, indices, weights)
+    degree = np.bincount(_row_ids(indptr), weights=weights, minlength=len(node_ids))
+    communities = label_propagation(indptr, indices, weights)
+    return node_ids, {"pagerank": scores, "degree": degree, "community": communities}
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Compact Graph Storage
+Struct-of-arrays relationship store: interned ids, parallel typed arrays
+"""
+
+import math
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+RelKey = Tuple[str, str, str]
+
+# compact_if_sparse() rebuilds once tombstones are this fraction of the arrays
+COMPACT_DEAD_RATIO = 0.25
+
+RELATIONSHIP_FIELDS = (
+    "from_id", "to_id", "rel_type", "strength", "bidirectional",
+    "created", "last_reinforced", "reinforcement_count", "metadata",
+)
+
+
+class IdInterner:
+    """Bidirectional string <-> dense int mapping"""
+
+    __slots__ = ("ids", "index")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.ids)
+            self.index[value] = code
+            self.ids.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self.index.get(value)
+
+    def __getitem__(self, code: int) -> str:
+        return self.ids[code]
+
+
+class DecayModel:
+    """
+    Exponential forgetting: an edge's effective strength halves every half_life
+    seconds since it was last reinforced. Stored strengths never change; the
+    decayed value is computed when read, so no periodic sweep over all edges.
+    """
+
+    def __init__(self, half_life: float, type_half_lives: Dict[str, float] = None):
+        self.half_life = half_life
+        # Per relationship type override (None or inf = never decays)
+        self.type_half_lives = dict(type_half_lives or {})
+
+    def rate(self, rel_type: str) -> float:
+        """Decay constant ln(2) / half_life for a relationship type (0 = no decay)"""
+        half_life = self.type_half_lives.get(rel_type, self.half_life)
+        if not half_life or math.isinf(half_life):
+            return 0.0
+        return math.log(2.0) / half_life
+
+    def decayed(self, strength: float, rel_type: str, elapsed: float) -> float:
+        if elapsed <= 0.0:
+            return strength
+        return strength * math.exp(-self.rate(rel_type) * elapsed)
+
+    def to_dict(self) -> Dict:
+        return {"half_life": self.half_life, "type_half_lives": self.type_half_lives}
+
+
+class RelationshipView:
+    """
+    Thin read/write view of one stored edge. Exposes the same attributes as
+    Relationship; assignments write through to the store's arrays.
+    """
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "RelationshipStore", index: int):
+        self._store = store
+        self._i = index
+
+    @property
+    def from_id(self) -> str:
+        return self._store.node_ids[self._store._from[self._i]]
+
+    @property
+    def to_id(self) -> str:
+        return self._store.node_ids[self._store._to[self._i]]
+
+    @property
+    def rel_type(self) -> str:
+        return self._store.rel_types[self._store._type[self._i]]
+
+    @property
+    def strength(self) -> float:
+        return self._store._strength[self._i]
+
+    @strength.setter
+    def strength(self, value: float):
+        self._store._strength[self._i] = value
+        self._store._touch(self._i)
+
+    @property
+    def bidirectional(self) -> bool:
+        return bool(self._store._bidirectional[self._i])
+
+    @bidirectional.setter
+    def bidirectional(self, value: bool):
+        self._store._bidirectional[self._i] = 1 if value else 0
+        self._store._touch(self._i)
+
+    @property
+    def created(self) -> float:
+        return self._store._created[self._i]
+
+    @created.setter
+    def created(self, value: float):
+        self._store._created[self._i] = value
+        self._store._touch(self._i)
+
+    @property
+    def last_reinforced(self) -> float:
+        return self._store._last_reinforced[self._i]
+
+    @last_reinforced.setter
+    def last_reinforced(self, value: float):
+        self._store._last_reinforced[self._i] = value
+        self._store._touch(self._i)
+
+    @property
+    def reinforcement_count(self) -> int:
+        return self._store._count[self._i]
+
+    @reinforcement_count.setter
+    def reinforcement_count(self, value: int):
+        self._store._count[self._i] = value
+        self._store._touch(self._i)
+
+    @property
+    def metadata(self) -> Optional[Dict]:
+        """Rebuilt from the packed columns: assign a new dict to change it"""
+        return self._store._get_metadata(self._i)
+
+    @metadata.setter
+    def metadata(self, value: Optional[Dict]):
+        self._store._set_metadata(self._i, value)
+        self._store._touch(self._i)
+
+    def effective_strength(self, now: float = None) -> float:
+        """Strength after decay since last_reinforced (the stored value if no decay model)"""
+        decay = self._store.decay
+        if decay is None:
+            return self.strength
+        if now is None:
+            now = time.time()
+        return decay.decayed(self.strength, self.rel_type, now - self.last_reinforced)
+
+    def to_dict(self) -> Dict:
+        """Same keys and order as dataclasses.asdict(Relationship)"""
+        return {name: getattr(self, name) for name in RELATIONSHIP_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"RelationshipView({self.from_id!r} -[{self.rel_type}]-> {self.to_id!r})"
+
+
+class RelationshipStore:
+    """
+    Relationships keyed by (from_id, to_id, rel_type)
+    O(1) lookup/insert, O(degree) neighbour lookups via adjacency indexes.
+    Iteration preserves insertion order (matches the old list export).
+
+    Edges live in parallel typed arrays indexed by edge number; node ids and
+    relationship types are interned to ints. Removal leaves a tombstone so
+    outstanding views stay valid; compact() reclaims the space.
+
+    With a DecayModel, effective strengths are derived from last_reinforced at
+    read time (RelationshipView.effective_strength, edge_columns(at=...)).
+    """
+
+    def __init__(self, decay: DecayModel = None):
+        self.decay = decay
+        self.node_ids = IdInterner()
+        self.rel_types = IdInterner()
+
+        self._from = array('q')
+        self._to = array('q')
+        self._type = array('i')
+        self._strength = array('d')
+        self._bidirectional = array('b')
+        self._created = array('d')
+        self._last_reinforced = array('d')
+        self._count = array('q')
+        self._alive = array('b')
+        # Metadata: "occurrences" counts in a typed column (-1 = absent) and
+        # "offsets" lists packed into one array (start/length per edge, -1 =
+        # absent), since most extracted_from/mentioned_in edges carry them.
+        # Only other keys (e.g. inferred kNN edges) live in the sparse dict.
+        self._occurrences = array('q')
+        self._offsets = array('q')
+        self._offsets_at = array('q')
+        self._offsets_len = array('i')
+        self._metadata: Dict[int, Dict] = {}
+
+        # Packed (from, to, type) -> edge number
+        self._by_key: Dict[int, int] = {}
+        # Adjacency as intrusive linked lists: head per node/type code, next per
+        # edge (-1 terminates), so no per-node container objects are allocated
+        self._out_head = array('q')
+        self._in_head = array('q')
+        self._type_head = array('q')
+        self._out_next = array('q')
+        self._in_next = array('q')
+        self._type_next = array('q')
+
+        # Change tracking (off unless track_changes() is called): edge numbers
+        # added or modified, and keys removed, since the last drain_changes()
+        self._dirty: Optional[set] = None
+        self._dropped: List[RelKey] = []
+
+    @staticmethod
+    def _pack(from_code: int, to_code: int, type_code: int) -> int:
+        return (((from_code << 32) | to_code) << 16) | type_code
+
+    def _key_code(self, from_id: str, to_id: str, rel_type: str) -> Optional[int]:
+        f = self.node_ids.lookup(from_id)
+        t = self.node_ids.lookup(to_id)
+        r = self.rel_types.lookup(rel_type)
+        if f is None or t is None or r is None:
+            return None
+        return self._pack(f, t, r)
+
+    def _chain(self, heads: array, links: array, code: int) -> List[int]:
+        """Live edge numbers on one adjacency chain, in insertion order"""
+        if code >= len(heads):
+            return []
+        alive = self._alive
+        edges = []
+        i = heads[code]
+        while i >= 0:
+            if alive[i]:
+                edges.append(i)
+            i = links[i]
+        edges.reverse()
+        return edges
+
+    @staticmethod
+    def _link(heads: array, links: array, code: int, index: int):
+        while len(heads) <= code:
+            heads.append(-1)
+        links.append(heads[code])
+        heads[code] = index
+
+    def _get_metadata(self, index: int) -> Optional[Dict]:
+        occurrences = self._occurrences[index]
+        at = self._offsets_at[index]
+        extra = self._metadata.get(index)
+        if occurrences < 0 and at < 0:
+            return None if extra is None else dict(extra)
+        metadata = {}
+        if occurrences >= 0:
+            metadata["occurrences"] = occurrences
+        if at >= 0:
+            metadata["offsets"] = self._offsets[at:at + self._offsets_len[index]].tolist()
+        if extra:
+            metadata.update(extra)
+        return metadata
+
+    def _set_metadata(self, index: int, value: Optional[Dict]):
+        self._occurrences[index] = -1
+        self._offsets_at[index] = -1
+        self._offsets_len[index] = 0
+        self._metadata.pop(index, None)
+        if value is None:
+            return
+        extra = dict(value)
+        occurrences = extra.get("occurrences")
+        if type(occurrences) is int and occurrences >= 0:
+            self._occurrences[index] = extra.pop("occurrences")
+        offsets = extra.get("offsets")
+        if isinstance(offsets, list) and all(type(o) is int for o in offsets):
+            # Replaced lists leave their old span behind until compact()
+            self._offsets_at[index] = len(self._offsets)
+            self._offsets_len[index] = len(offsets)
+            self._offsets.extend(extra.pop("offsets"))
+        if extra or len(extra) == len(value):
+            self._metadata[index] = extra
+
+    def _touch(self, index: int):
+        if self._dirty is not None:
+            self._dirty.add(index)
+
+    def track_changes(self):
+        """Start recording changes for drain_changes()"""
+        if self._dirty is None:
+            self._dirty = set()
+            self._dropped = []
+
+    def drain_changes(self) -> Tuple[List[RelationshipView], List[RelKey]]:
+        """(live edges added or modified, keys removed) since the last call; resets both"""
+        if self._dirty is None:
+            return [], []
+        alive = self._alive
+        changed = [RelationshipView(self, i) for i in sorted(self._dirty) if alive[i]]
+        dropped = self._dropped
+        self._dirty, self._dropped = set(), []
+        return changed, dropped
+
+    def key_code(self, rel: RelationshipView) -> int:
+        """Packed (from, to, type) code of a stored edge; stable across compact()"""
+        i = rel._i
+        return self._pack(self._from[i], self._to[i], self._type[i])
+
+    def has_key_code(self, code: int) -> bool:
+        return code in self._by_key
+
+    def unpack_key(self, code: int) -> RelKey:
+        type_code = code & 0xFFFF
+        to_code = (code >> 16) & 0xFFFFFFFF
+        from_code = code >> 48
+        return self.node_ids[from_code], self.node_ids[to_code], self.rel_types[type_code]
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __iter__(self) -> Iterator[RelationshipView]:
+        alive = self._alive
+        return (RelationshipView(self, i) for i in range(len(alive)) if alive[i])
+
+    def __contains__(self, key: RelKey) -> bool:
+        code = self._key_code(*key)
+        return code is not None and code in self._by_key
+
+    def get(self, from_id: str, to_id: str, rel_type: str) -> Optional[RelationshipView]:
+        code = self._key_code(from_id, to_id, rel_type)
+        index = self._by_key.get(code) if code is not None else None
+        return None if index is None else RelationshipView(self, index)
+
+    def add(self, rel) -> RelationshipView:
+        """Insert a relationship that is not already stored (copied into the arrays)"""
+        f = self.node_ids.intern(rel.from_id)
+        t = self.node_ids.intern(rel.to_id)
+        r = self.rel_types.intern(rel.rel_type)
+        index = len(self._alive)
+
+        self._from.append(f)
+        self._to.append(t)
+        self._type.append(r)
+        self._strength.append(rel.strength)
+        self._bidirectional.append(1 if rel.bidirectional else 0)
+        self._created.append(rel.created)
+        self._last_reinforced.append(rel.last_reinforced)
+        self._count.append(rel.reinforcement_count)
+        self._alive.append(1)
+        self._occurrences.append(-1)
+        self._offsets_at.append(-1)
+        self._offsets_len.append(0)
+        if rel.metadata is not None:
+            self._set_metadata(index, rel.metadata)
+
+        self._by_key[self._pack(f, t, r)] = index
+        self._link(self._out_head, self._out_next, f, index)
+        self._link(self._in_head, self._in_next, t, index)
+        self._link(self._type_head, self._type_next, r, index)
+        self._touch(index)
+        return RelationshipView(self, index)
+
+    def remove(self, from_id: str, to_id: str, rel_type: str) -> Optional[Dict]:
+        """Drop a relationship; returns its final field values"""
+        code = self._key_code(from_id, to_id, rel_type)
+        index = self._by_key.pop(code, None) if code is not None else None
+        if index is None:
+            return None
+        record = RelationshipView(self, index).to_dict()
+        self._alive[index] = 0
+        self._set_metadata(index, None)
+        if self._dirty is not None:
+            self._dirty.discard(index)
+            self._dropped.append((from_id, to_id, rel_type))
+        return record
+
+    def outgoing(self, node_id: str, rel_type: str = None) -> List[RelationshipView]:
+        """Edges leaving node_id, optionally filtered by type"""
+        return self._neighbours(self._out_head, self._out_next, node_id, rel_type)
+
+    def incoming(self, node_id: str, rel_type: str = None) -> List[RelationshipView]:
+        """Edges arriving at node_id, optionally filtered by type"""
+        return self._neighbours(self._in_head, self._in_next, node_id, rel_type)
+
+    def _neighbours(self, heads: array, links: array, node_id: str,
+                    rel_type: Optional[str]) -> List[RelationshipView]:
+        code = self.node_ids.lookup(node_id)
+        if code is None:
+            return []
+        edges = self._chain(heads, links, code)
+        if rel_type is None:
+            return [RelationshipView(self, i) for i in edges]
+        type_code = self.rel_types.lookup(rel_type)
+        types = self._type
+        return [RelationshipView(self, i) for i in edges if types[i] == type_code]
+
+    def of_type(self, rel_type: str) -> List[RelationshipView]:
+        code = self.rel_types.lookup(rel_type)
+        if code is None:
+            return []
+        return [RelationshipView(self, i)
+                for i in self._chain(self._type_head, self._type_next, code)]
+
+    def type_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for code, rel_type in enumerate(self.rel_types.ids):
+            live = len(self._chain(self._type_head, self._type_next, code))
+            if live:
+                counts[rel_type] = live
+        return counts
+
+    def edge_columns(self, at: float = None):
+        """
+        Live edges as NumPy arrays: (edge numbers, from codes, to codes, type codes,
+        strengths). Codes index node_ids / rel_types. Built from zero-copy views
+        of the typed arrays, then filtered. With `at` (a timestamp) the strengths
+        are the decayed values at that time.
+        """
+        import numpy as np
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool) if len(self._alive) \
+            else np.zeros(0, dtype=bool)
+        edges = np.flatnonzero(alive)
+
+        def column(values: array, dtype) -> "np.ndarray":
+            if not len(values):
+                return np.zeros(0, dtype=dtype)
+            return np.frombuffer(values, dtype=dtype)[edges]
+
+        types = column(self._type, np.int32)
+        strengths = column(self._strength, np.float64)
+        if at is not None and self.decay is not None and len(edges):
+            strengths = strengths * self._decay_factors(
+                types, at - column(self._last_reinforced, np.float64))
+        return (edges,
+                column(self._from, np.int64),
+                column(self._to, np.int64),
+                types,
+                strengths)
+
+    def _decay_factors(self, type_codes, elapsed):
+        """exp(-rate * elapsed) per edge, with one rate looked up per type code"""
+        import numpy as np
+        rates = np.array([self.decay.rate(t) for t in self.rel_types.ids], dtype=np.float64)
+        return np.exp(-rates[type_codes] * np.maximum(elapsed, 0.0))
+
+    def materialise_strengths(self, at: float = None):
+        """(edge numbers, effective strengths at time `at`) for every live edge, in iteration order"""
+        edges, _, _, _, strengths = self.edge_columns(time.time() if at is None else at)
+        return edges, strengths
+
+    def prune(self, floor: float, at: float = None, rel_types: List[str] = None) -> List[Dict]:
+        """
+        Remove edges whose effective strength at `at` is below floor (optionally
+        only of the given types); returns the removed records.
+        """
+        import numpy as np
+        edges, _, _, type_codes, strengths = self.edge_columns(time.time() if at is None else at)
+        weak = strengths < floor
+        if rel_types is not None:
+            codes = [c for c in (self.rel_types.lookup(t) for t in rel_types) if c is not None]
+            weak &= np.isin(type_codes, codes)
+        removed = []
+        for i in edges[weak].tolist():
+            view = RelationshipView(self, i)
+            removed.append(self.remove(view.from_id, view.to_id, view.rel_type))
+        return removed
+
+    @property
+    def tombstones(self) -> int:
+        """Removed edges still occupying array slots"""
+        return len(self._alive) - len(self._by_key)
+
+    def compact_if_sparse(self, max_dead_ratio: float = COMPACT_DEAD_RATIO) -> bool:
+        """compact() if tombstones exceed max_dead_ratio of the arrays; True if it did"""
+        if not self._alive or self.tombstones <= max_dead_ratio * len(self._alive):
+            return False
+        self.compact()
+        return True
+
+    def compact(self):
+        """Rebuild the arrays without tombstones. Invalidates existing views."""
+        live = [RelationshipView(self, i).to_dict() for i in range(len(self._alive)) if self._alive[i]]
+        node_ids, rel_types = self.node_ids, self.rel_types
+        tracking, dropped = self._dirty is not None, self._dropped
+        self.__init__(self.decay)
+        # Keep interned codes stable for callers holding them
+        self.node_ids, self.rel_types = node_ids, rel_types
+        if tracking:
+            # Edge numbers change, so every live edge is reported as changed
+            self.track_changes()
+            self._dropped = dropped
+        for record in live:
+            self.add(_Record(record))
+
+
+class _Record:
+    """Attribute access over a relationship dict (used when re-adding)"""
+
+    __slots__ = RELATIONSHIP_FIELDS
+
+    def __init__(self, record: Dict):
+        for name in RELATIONSHIP_FIELDS:
+            setattr(self, name, record[name])
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Graph Export
+Streaming JSON Lines graph files with a memory-mappable embedding sidecar
+
+Layout (in knowledge_graph_output/):
+    nodes.jsonl          one node per line (embedding omitted)
+    relationships.jsonl  one relationship per line
+    embeddings.npy       float32 matrix, row i belongs to embedding_ids[i]
+    embedding_ids.json   node id of each embedding row
+    chunk_embeddings.npy unit-norm float32 passage embeddings (--chunk-size builds)
+    chunk_ids.json       chunk node id of each passage row
+    deltas/log.json      build sequence number and which deltas are retained
+    deltas/delta_<seq>.jsonl  changes from build seq-1 to seq (header line first)
+
+An export only leaves its own format's snapshot behind: files of the other
+format from earlier builds are deleted, so a reader never sees a stale graph.
+
+A consumer holding build `n` catches up with GraphReader.deltas_since(n),
+or re-reads the snapshot when that returns None (n older than min_seq).
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+NODES_JSONL = "nodes.jsonl"
+RELATIONSHIPS_JSONL = "relationships.jsonl"
+EMBEDDINGS_NPY = "embeddings.npy"
+EMBEDDING_IDS_JSON = "embedding_ids.json"
+CHUNK_EMBEDDINGS_NPY = "chunk_embeddings.npy"
+CHUNK_IDS_JSON = "chunk_ids.json"
+DELTAS_DIR = "deltas"
+DELTA_LOG_JSON = "log.json"
+
+
+def write_jsonl(path: Path, records: Iterable[Dict]) -> int:
+    """Write records one per line as they are produced; returns the count"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp_path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict]:
+    """Read records back one line at a time"""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_embeddings(output_dir: Path, ids: List[str], matrix,
+                     matrix_name: str = EMBEDDINGS_NPY, ids_name: str = EMBEDDING_IDS_JSON) -> None:
+    import numpy as np
+    output_dir = Path(output_dir)
+    tmp_path = output_dir / (matrix_name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+    os.replace(tmp_path, output_dir / matrix_name)
+    with open(output_dir / ids_name, 'w') as f:
+        json.dump(ids, f)
+
+
+def load_embeddings(output_dir: Path, mmap: bool = True, matrix_name: str = EMBEDDINGS_NPY,
+                    ids_name: str = EMBEDDING_IDS_JSON) -> Tuple[List[str], Optional[object]]:
+    """(ids, matrix) from the sidecar; the matrix is memory-mapped read-only by default"""
+    import numpy as np
+    output_dir = Path(output_dir)
+    ids_path = output_dir / ids_name
+    if not ids_path.exists():
+        return [], None
+    with open(ids_path, 'r') as f:
+        ids = json.load(f)
+    matrix = np.load(output_dir / matrix_name, mmap_mode='r' if mmap else None)
+    return ids, matrix
+
+
+def delta_path(output_dir: Path, seq: int) -> Path:
+    return Path(output_dir) / DELTAS_DIR / f"delta_{seq:06d}.jsonl"
+
+
+def read_delta_log(output_dir: Path) -> Dict:
+    """{"seq": last build, "min_seq": oldest build deltas apply to, "deltas": [seq, ...]}"""
+    path = Path(output_dir) / DELTAS_DIR / DELTA_LOG_JSON
+    if not path.exists():
+        return {"seq": 0, "min_seq": 0, "deltas": []}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_delta_log(output_dir: Path, log: Dict):
+    path = Path(output_dir) / DELTAS_DIR / DELTA_LOG_JSON
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(log, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class GraphReader:
+    """Open an exported graph without loading it all into memory"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self._embedding_ids: Optional[List[str]] = None
+        self._embedding_rows: Dict[str, int] = {}
+        self._embeddings = None
+
+    @staticmethod
+    def exists(output_dir: str) -> bool:
+        return (Path(output_dir) / NODES_JSONL).exists()
+
+    def nodes(self) -> Iterator[Dict]:
+        return iter_jsonl(self.output_dir / NODES_JSONL)
+
+    def relationships(self) -> Iterator[Dict]:
+        return iter_jsonl(self.output_dir / RELATIONSHIPS_JSONL)
+
+    def delta_log(self) -> Dict:
+        return read_delta_log(self.output_dir)
+
+    def deltas_since(self, seq: int) -> Optional[Iterator[Dict]]:
+        """
+        Change records taking a consumer from build `seq` to the latest, in
+        order: {"op": "add"|"update"|"remove", "kind": "node"|"edge", ...}.
+        None means the deltas no longer reach back that far: re-read the snapshot.
+        """
+        log = self.delta_log()
+        if seq < log["min_seq"] or seq > log["seq"]:
+            return None
+        pending = [n for n in log["deltas"] if n > seq]
+
+        def records() -> Iterator[Dict]:
+            for n in pending:
+                lines = iter_jsonl(delta_path(self.output_dir, n))
+                next(lines)  # header
+                yield from lines
+        return records()
+
+    def _load_embeddings(self):
+        if self._embedding_ids is None:
+            self._embedding_ids, self._embeddings = load_embeddings(self.output_dir)
+            self._embedding_rows = {node_id: row for row, node_id in enumerate(self._embedding_ids)}
+
+    @property
+    def embedding_ids(self) -> List[str]:
+        self._load_embeddings()
+        return self._embedding_ids
+
+    @property
+    def embeddings(self):
+        """Memory-mapped float32 matrix aligned with embedding_ids (None if absent)"""
+        self._load_embeddings()
+        return self._embeddings
+
+    def embedding(self, node_id: str):
+        self._load_embeddings()
+        row = self._embedding_rows.get(node_id)
+        return None if row is None else self._embeddings[row]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Graph Query Engine
+In-memory retrieval over a built knowledge graph: neighbour expansion,
+k-hop BFS, strongest path, concept -> document posting-list intersection
+and passage retrieval over chunk embeddings
+"""
+
+import math
+import time
+import heapq
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Neighbour = Tuple[str, str, float]  # (node_id, rel_type, strength)
+
+
+class GraphQuery:
+    """
+    Query snapshot of a KnowledgeGraphBuilder. Adjacency is indexed once from
+    the relationship store's columns; call refresh() after the graph changes.
+    Traversal is undirected by default (concept -> document edges are walked
+    both ways); pass directed=True to follow edge direction only.
+    If the store has a decay model, strengths are the decayed values at `at`
+    (default: when the snapshot is indexed).
+    """
+
+    def __init__(self, builder, directed: bool = False, at: float = None):
+        self.builder = builder
+        self.directed = directed
+        self.at = at
+        self._passage_index = None
+        self.refresh()
+
+    def refresh(self):
+        """Re-index adjacency from the builder's current relationships"""
+        store = self.builder.relationships
+        at = None
+        if store.decay is not None:
+            at = time.time() if self.at is None else self.at
+        _, from_codes, to_codes, type_codes, strengths = store.edge_columns(at)
+        self._ids = store.node_ids
+        self._types = list(store.rel_types.ids)
+        n_nodes, n_types = len(self._ids), len(self._types)
+
+        # Per relationship type, per node code: [(neighbour code, strength, -log strength)]
+        # Splitting by type means filtered queries never touch other edge types
+        forward = [[[] for _ in range(n_nodes)] for _ in range(n_types)]
+        backward = forward if not self.directed else \
+            [[[] for _ in range(n_nodes)] for _ in range(n_types)]
+        for f, t, r, w in zip(from_codes.tolist(), to_codes.tolist(),
+                              type_codes.tolist(), strengths.tolist()):
+            cost = -math.log(w) if w > 0.0 else math.inf
+            forward[r][f].append((t, w, max(cost, 0.0)))
+            backward[r][t].append((f, w, max(cost, 0.0)))
+        self._forward = forward
+        self._backward = backward
+        self._passage_index = None
+
+    def _code(self, node_id: str) -> Optional[int]:
+        return self._ids.lookup(node_id)
+
+    def _type_codes(self, rel_types: Optional[Iterable[str]]) -> List[int]:
+        if rel_types is None:
+            return list(range(len(self._types)))
+        wanted = set(rel_types)
+        return [i for i, name in enumerate(self._types) if name in wanted]
+
+    def _edges(self, adjacency, code: int, types: List[int], min_strength: float):
+        for r in types:
+            for n, w, cost in adjacency[r][code]:
+                if w >= min_strength:
+                    yield n, w, cost, r
+
+    def neighbours(self, node_id: str, rel_types: Iterable[str] = None,
+                   min_strength: float = 0.0) -> List[Neighbour]:
+        """Directly connected nodes, strongest first"""
+        code = self._code(node_id)
+        if code is None:
+            return []
+        ids, types = self._ids, self._types
+        hits = [(ids[n], types[r], w) for n, w, _, r in
+                self._edges(self._forward, code, self._type_codes(rel_types), min_strength)]
+        hits.sort(key=lambda hit: -hit[2])
+        return hits
+
+    def k_hop(self, node_id: str, k: int, min_strength: float = 0.0,
+              rel_types: Iterable[str] = None) -> Dict[str, int]:
+        """Nodes reachable within k hops over edges >= min_strength, mapped to hop count"""
+        start = self._code(node_id)
+        if start is None or k <= 0:
+            return {}
+        types = self._type_codes(rel_types)
+        depth = {start: 0}
+        frontier = deque([start])
+        while frontier:
+            current = frontier.popleft()
+            hops = depth[current] + 1
+            if hops > k:
+                break  # BFS order: everything left is at depth k
+            for n, _, _, _ in self._edges(self._forward, current, types, min_strength):
+                if n not in depth:
+                    depth[n] = hops
+                    frontier.append(n)
+        del depth[start]
+        return {self._ids[n]: hops for n, hops in depth.items()}
+
+    def shortest_path(self, from_id: str, to_id: str, min_strength: float = 0.0,
+                      rel_types: Iterable[str] = None) -> Optional[Tuple[List[str], float]]:
+        """
+        Strongest path (Dijkstra on -log(strength), i.e. maximum product of
+        strengths). Returns (node ids, path strength) or None if unreachable.
+        Searches from both ends and stops when the two frontiers meet.
+        """
+        source, target = self._code(from_id), self._code(to_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [from_id], 1.0
+        types = self._type_codes(rel_types)
+        min_strength = max(min_strength, 1e-300)  # zero-strength edges are not paths
+
+        # index 0 searches forward from source, 1 backward from target
+        adjacency = (self._forward, self._backward)
+        best = ({source: 0.0}, {target: 0.0})
+        parent: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        settled = (set(), set())
+        shortest, meeting = math.inf, None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= shortest:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            cost, current = heapq.heappop(heaps[side])
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+            mine, other = best[side], best[1 - side]
+            for n, _, step, _ in self._edges(adjacency[side], current, types, min_strength):
+                candidate = cost + step
+                if candidate < mine.get(n, math.inf):
+                    mine[n] = candidate
+                    parent[side][n] = current
+                    heapq.heappush(heaps[side], (candidate, n))
+                if n in other and candidate + other[n] < shortest:
+                    shortest, meeting = candidate + other[n], n
+        if meeting is None:
+            return None
+
+        path = [meeting]
+        while path[-1] != source:
+            path.append(parent[0][path[-1]])
+        path.reverse()
+        while path[-1] != target:
+            path.append(parent[1][path[-1]])
+        return [self._ids[n] for n in path], math.exp(-shortest)
+
+    def _concept_id(self, concept: str) -> str:
+        """Accept a concept node id or a concept name"""
+        if concept in self.builder.nodes:
+            return concept
+        return self.builder.generate_id("concept", concept)
+
+    def documents_mentioning_all(self, concepts: Iterable[str]) -> List[str]:
+        """Document ids linked to every given concept (posting-list intersection)"""
+        postings = [self.builder.concept_documents.get(self._concept_id(c), set())
+                    for c in concepts]
+        if not postings:
+            return []
+        # Intersect from the rarest concept so the working set only shrinks
+        postings.sort(key=len)
+        result = set(postings[0])
+        for docs in postings[1:]:
+            result &= docs
+            if not result:
+                break
+        return sorted(result)
+
+    def passages(self, query, k: int = 5, concepts: Iterable[str] = None,
+                 encoder=None) -> List[Dict]:
+        """
+        The k chunks most similar to a text (or query vector), best first.
+        With concepts, only chunks mentioning every one of them are scored.
+        Needs chunk embeddings (builder.generate_chunk_embeddings()).
+        """
+        builder = self.builder
+        if builder.chunk_matrix is None or not builder.chunk_rows:
+            return []
+        if self._passage_index is None:
+            from vector_index import VectorIndex
+            ids = [None] * len(builder.chunk_rows)
+            for chunk_id, row in builder.chunk_rows.items():
+                ids[row] = chunk_id
+            self._passage_index = VectorIndex(ids, builder.chunk_matrix, normalised=True)
+        index = self._passage_index
+        if encoder is not None:
+            index.encoder = encoder
+
+        candidates = None
+        if concepts is not None:
+            store = builder.relationships
+            for concept in concepts:
+                chunks = {rel.to_id for rel in store.outgoing(self._concept_id(concept), "mentioned_in")}
+                candidates = chunks if candidates is None else candidates & chunks
+                if not candidates:
+                    return []
+
+        results = []
+        for chunk_id, score in index.nearest(query, k, candidates):
+            data = builder.nodes[chunk_id].data
+            document = builder.nodes.get(data["document_id"])
+            results.append({
+                "chunk_id": chunk_id,
+                "document_id": data["document_id"],
+                "title": document.data.get("title") if document else None,
+                "start": data["start"],
+                "end": data["end"],
+                "text": data["text"],
+                "score": score,
+            })
+        return results
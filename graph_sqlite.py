@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. SQLite Graph Store
+Durable copy of a build: nodes, relationships, document hashes and the
+incremental manifest, written back in batched transactions (WAL mode), so a
+crashed build resumes from the last checkpoint.
+
+Small graphs are built in memory and only checkpointed here. Past a size
+threshold the builder pages out: SqliteNodeMap and SqliteRelationshipStore
+serve nodes and edges from the tables instead, keeping only a bounded set of
+recently used nodes (plus interned ids) in memory. Their writes join the
+connection's open transaction, so they become durable with the next
+checkpoint (write()) and a crash still rolls back to a consistent graph.
+
+Tables:
+    nodes(id, type, data, created, last_accessed, access_count)
+    relationships(from_id, to_id, rel_type, strength, ..., metadata)
+    document_hashes(hash)
+    manifest(path, entry)
+    meta(key, value)        version, vocabulary_hash, pruned_pairs, export_seq
+"""
+
+import json
+import time
+import sqlite3
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from graph_compact import RELATIONSHIP_FIELDS, DecayModel, IdInterner, RelationshipStore
+
+WRITE_BATCH_ROWS = 10000
+# Rows fetched per query when paging through a table
+READ_PAGE_ROWS = 1000
+# Nodes a SqliteNodeMap keeps loaded
+RESIDENT_NODES = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created REAL,
+    last_accessed REAL,
+    access_count INTEGER
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS nodes_by_type ON nodes(type);
+CREATE INDEX IF NOT EXISTS nodes_by_created ON nodes(created, id);
+
+CREATE TABLE IF NOT EXISTS relationships (
+    from_id TEXT NOT NULL,
+    to_id TEXT NOT NULL,
+    rel_type TEXT NOT NULL,
+    strength REAL,
+    bidirectional INTEGER,
+    created REAL,
+    last_reinforced REAL,
+    reinforcement_count INTEGER,
+    metadata TEXT,
+    PRIMARY KEY (from_id, to_id, rel_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS relationships_by_to ON relationships(to_id);
+CREATE INDEX IF NOT EXISTS relationships_by_type ON relationships(rel_type);
+
+CREATE TABLE IF NOT EXISTS document_hashes (hash TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS manifest (path TEXT PRIMARY KEY, entry TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+NODE_COLUMNS = ("id", "type", "data", "created", "last_accessed", "access_count")
+RELATIONSHIP_COLUMNS = ("from_id", "to_id", "rel_type", "strength", "bidirectional",
+                        "created", "last_reinforced", "reinforcement_count", "metadata")
+
+UPSERT_NODE = f"INSERT OR REPLACE INTO nodes VALUES ({', '.join('?' * len(NODE_COLUMNS))})"
+UPSERT_RELATIONSHIP = f"INSERT OR REPLACE INTO relationships " \
+                      f"VALUES ({', '.join('?' * len(RELATIONSHIP_COLUMNS))})"
+
+
+def _node_row(n) -> Tuple:
+    return n.id, n.type, json.dumps(n.data), n.created, n.last_accessed, n.access_count
+
+
+def _relationship_row(r) -> Tuple:
+    return (r.from_id, r.to_id, r.rel_type, r.strength, int(r.bidirectional), r.created,
+            r.last_reinforced, r.reinforcement_count,
+            None if r.metadata is None else json.dumps(r.metadata))
+
+
+def _batches(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SqliteGraphStore:
+    """
+    One SQLite file holding the last checkpointed state of a build. Each
+    write() is a single transaction, so the file always holds a consistent
+    graph together with the manifest of the files it covers.
+    """
+
+    def __init__(self, path: Path, batch_rows: int = WRITE_BATCH_ROWS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_rows = batch_rows
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commits survive a process crash; only an OS crash can lose the last one
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def count(self) -> int:
+        """Nodes plus relationships stored"""
+        return self.conn.execute("SELECT (SELECT COUNT(*) FROM nodes) + "
+                                 "(SELECT COUNT(*) FROM relationships)").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def iter_nodes(self) -> Iterator[Dict]:
+        """Node field dicts (embedding omitted; it is rebuilt from the embedding cache)"""
+        # Creation order approximates the in-memory insertion order, which
+        # decides related_to edge direction on the next build
+        cursor = self.conn.execute(f"SELECT {', '.join(NODE_COLUMNS)} FROM nodes ORDER BY created, id")
+        for node_id, type, data, created, last_accessed, access_count in cursor:
+            yield {"id": node_id, "type": type, "data": json.loads(data), "embedding": None,
+                   "created": created, "last_accessed": last_accessed, "access_count": access_count}
+
+    def iter_relationships(self) -> Iterator[Dict]:
+        cursor = self.conn.execute(f"SELECT {', '.join(RELATIONSHIP_COLUMNS)} FROM relationships "
+                                   f"ORDER BY created, from_id, to_id, rel_type")
+        for row in cursor:
+            record = dict(zip(RELATIONSHIP_COLUMNS, row))
+            record["bidirectional"] = bool(record["bidirectional"])
+            record["metadata"] = None if record["metadata"] is None else json.loads(record["metadata"])
+            yield record
+
+    def document_hashes(self) -> Set[str]:
+        return {row[0] for row in self.conn.execute("SELECT hash FROM document_hashes")}
+
+    def manifest(self) -> Dict[str, Dict]:
+        return {path: json.loads(entry)
+                for path, entry in self.conn.execute("SELECT path, entry FROM manifest")}
+
+    def write(self, nodes: Iterable = (), removed_nodes: Iterable[str] = (),
+              relationships: Iterable = (), removed_relationships: Iterable[Tuple[str, str, str]] = (),
+              added_hashes: Iterable[str] = (), removed_hashes: Iterable[str] = (),
+              manifest: Dict[str, Dict] = None, removed_paths: Iterable[str] = (),
+              meta: Dict[str, str] = None):
+        """
+        Apply one checkpoint atomically. Deletes run before upserts, so a key
+        removed and re-added since the last checkpoint ends up present.
+        `nodes` are Node-like objects, `relationships` relationship views.
+        """
+        def run(sql: str, rows: Iterable[Tuple]):
+            for batch in _batches(rows, self.batch_rows):
+                self.conn.executemany(sql, batch)
+
+        with self.conn:
+            run("DELETE FROM nodes WHERE id = ?", ((node_id,) for node_id in removed_nodes))
+            run("DELETE FROM relationships WHERE from_id = ? AND to_id = ? AND rel_type = ?",
+                removed_relationships)
+            run("DELETE FROM document_hashes WHERE hash = ?", ((h,) for h in removed_hashes))
+            run("DELETE FROM manifest WHERE path = ?", ((path,) for path in removed_paths))
+
+            run(UPSERT_NODE, (_node_row(n) for n in nodes))
+            run(UPSERT_RELATIONSHIP, (_relationship_row(r) for r in relationships))
+            run("INSERT OR IGNORE INTO document_hashes VALUES (?)", ((h,) for h in added_hashes))
+            run("INSERT OR REPLACE INTO manifest VALUES (?, ?)",
+                ((path, json.dumps(entry)) for path, entry in (manifest or {}).items()))
+            run("INSERT OR REPLACE INTO meta VALUES (?, ?)", (meta or {}).items())
+
+    def clear(self):
+        with self.conn:
+            for table in ("nodes", "relationships", "document_hashes", "manifest", "meta"):
+                self.conn.execute(f"DELETE FROM {table}")
+
+
+class SqliteNodeMap(MutableMapping):
+    """
+    Node id -> node mapping served from the nodes table, for graphs too big to
+    hold in memory. The `resident` most recently used nodes stay loaded as
+    objects; changes to a node are written back when it is evicted or on
+    flush(), so call touch() before modifying one. Iteration pages through the
+    table in (created, id) order, the order iter_nodes() resumes in.
+    """
+
+    def __init__(self, store: SqliteGraphStore, node_factory: Callable[..., object],
+                 resident: int = RESIDENT_NODES):
+        self.store = store
+        self.conn = store.conn
+        self.node_factory = node_factory
+        self.resident = resident
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._count = self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def _load(self, row: Tuple):
+        node_id, type, data, created, last_accessed, access_count = row
+        return self.node_factory(id=node_id, type=type, data=json.loads(data), embedding=None,
+                                 created=created, last_accessed=last_accessed,
+                                 access_count=access_count)
+
+    def _keep(self, node_id: str, node):
+        self._cache[node_id] = node
+        self._cache.move_to_end(node_id)
+        while len(self._cache) > self.resident:
+            evicted_id, evicted = self._cache.popitem(last=False)
+            if evicted_id in self._dirty:
+                self._dirty.discard(evicted_id)
+                self.conn.execute(UPSERT_NODE, _node_row(evicted))
+
+    def touch(self, node_id: str):
+        """Mark a node as modified (written back on eviction or flush)"""
+        self._dirty.add(node_id)
+
+    def flush(self):
+        """Write modified resident nodes into the open transaction (committed by the next write())"""
+        rows = [_node_row(self._cache[node_id]) for node_id in self._dirty if node_id in self._cache]
+        for batch in _batches(rows, self.store.batch_rows):
+            self.conn.executemany(UPSERT_NODE, batch)
+        self._dirty.clear()
+
+    def __getitem__(self, node_id: str):
+        node = self._cache.get(node_id)
+        if node is None:
+            row = self.conn.execute(f"SELECT {', '.join(NODE_COLUMNS)} FROM nodes WHERE id = ?",
+                                    (node_id,)).fetchone()
+            if row is None:
+                raise KeyError(node_id)
+            node = self._load(row)
+        self._keep(node_id, node)
+        return node
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._cache or self.conn.execute(
+            "SELECT 1 FROM nodes WHERE id = ?", (node_id,)).fetchone() is not None
+
+    def __setitem__(self, node_id: str, node):
+        if node_id not in self:
+            self._count += 1
+        self._dirty.add(node_id)
+        self._keep(node_id, node)
+
+    def __delitem__(self, node_id: str):
+        if node_id not in self:
+            raise KeyError(node_id)
+        self._cache.pop(node_id, None)
+        self._dirty.discard(node_id)
+        self.conn.execute("DELETE FROM nodes WHERE id = ?", (node_id,))
+        self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _pages(self) -> Iterator[List[Tuple]]:
+        # Keyset pagination: no cursor stays open while callers write between pages
+        self.flush()
+        sql = f"SELECT {', '.join(NODE_COLUMNS)} FROM nodes"
+        order = " ORDER BY created, id LIMIT ?"
+        rows = self.conn.execute(sql + order, (READ_PAGE_ROWS,)).fetchall()
+        while rows:
+            yield rows
+            last = rows[-1]
+            rows = self.conn.execute(sql + " WHERE (created, id) > (?, ?)" + order,
+                                     (last[3], last[0], READ_PAGE_ROWS)).fetchall()
+
+    def __iter__(self) -> Iterator[str]:
+        for rows in self._pages():
+            yield from (row[0] for row in rows)
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        """(id, node) pairs; resident nodes are returned as the loaded objects"""
+        for rows in self._pages():
+            for row in rows:
+                node = self._cache.get(row[0])
+                yield row[0], (self._load(row) if node is None else node)
+
+    def values(self) -> Iterator[object]:
+        return (node for _, node in self.items())
+
+    def clear(self):
+        self._cache.clear()
+        self._dirty.clear()
+        self.conn.execute("DELETE FROM nodes")
+        self._count = 0
+
+
+class SqliteRelationshipView:
+    """
+    One relationship row. Reads come from the row fetched with it; assignments
+    UPDATE the row in the open transaction (same attributes as RelationshipView).
+    """
+
+    __slots__ = ("_store", "_record")
+
+    def __init__(self, store: "SqliteRelationshipStore", record: Dict):
+        self._store = store
+        self._record = record
+
+    def _set(self, name: str, value, column_value=None):
+        r = self._record
+        self._store.conn.execute(
+            f"UPDATE relationships SET {name} = ? WHERE from_id = ? AND to_id = ? AND rel_type = ?",
+            (value if column_value is None else column_value, r["from_id"], r["to_id"], r["rel_type"]))
+        r[name] = value
+
+    @property
+    def from_id(self) -> str:
+        return self._record["from_id"]
+
+    @property
+    def to_id(self) -> str:
+        return self._record["to_id"]
+
+    @property
+    def rel_type(self) -> str:
+        return self._record["rel_type"]
+
+    @property
+    def strength(self) -> float:
+        return self._record["strength"]
+
+    @strength.setter
+    def strength(self, value: float):
+        self._set("strength", value)
+
+    @property
+    def bidirectional(self) -> bool:
+        return self._record["bidirectional"]
+
+    @bidirectional.setter
+    def bidirectional(self, value: bool):
+        self._set("bidirectional", bool(value), int(bool(value)))
+
+    @property
+    def created(self) -> float:
+        return self._record["created"]
+
+    @created.setter
+    def created(self, value: float):
+        self._set("created", value)
+
+    @property
+    def last_reinforced(self) -> float:
+        return self._record["last_reinforced"]
+
+    @last_reinforced.setter
+    def last_reinforced(self, value: float):
+        self._set("last_reinforced", value)
+
+    @property
+    def reinforcement_count(self) -> int:
+        return self._record["reinforcement_count"]
+
+    @reinforcement_count.setter
+    def reinforcement_count(self, value: int):
+        self._set("reinforcement_count", value)
+
+    @property
+    def metadata(self) -> Optional[Dict]:
+        """A copy: assign a new dict to change it"""
+        metadata = self._record["metadata"]
+        return None if metadata is None else dict(metadata)
+
+    @metadata.setter
+    def metadata(self, value: Optional[Dict]):
+        value = None if value is None else dict(value)
+        self._set("metadata", value, None if value is None else json.dumps(value))
+
+    def effective_strength(self, now: float = None) -> float:
+        """Strength after decay since last_reinforced (the stored value if no decay model)"""
+        decay = self._store.decay
+        if decay is None:
+            return self.strength
+        if now is None:
+            now = time.time()
+        return decay.decayed(self.strength, self.rel_type, now - self.last_reinforced)
+
+    def to_dict(self) -> Dict:
+        """Same keys and order as dataclasses.asdict(Relationship)"""
+        return {name: getattr(self, name) for name in RELATIONSHIP_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"SqliteRelationshipView({self.from_id!r} -[{self.rel_type}]-> {self.to_id!r})"
+
+
+class SqliteRelationshipStore:
+    """
+    RelationshipStore served from the relationships table: lookups, neighbour
+    queries and iteration are SQL over the primary key and the to_id/rel_type
+    indexes, and edits are written straight into the open transaction. Only
+    the id interners are held in memory, so edge_columns() codes and the
+    packed key codes of delta baselines stay compatible with the in-memory
+    store they replace. Iteration and edge_columns() share primary key order.
+    """
+
+    tombstones = 0
+
+    def __init__(self, store: SqliteGraphStore, decay: DecayModel = None,
+                 node_ids: IdInterner = None, rel_types: IdInterner = None):
+        self.store = store
+        self.conn = store.conn
+        self.decay = decay
+        # Codes already in the given interners are kept; stored ids are added
+        self.node_ids = IdInterner() if node_ids is None else node_ids
+        self.rel_types = IdInterner() if rel_types is None else rel_types
+        for (node_id,) in self.conn.execute("SELECT id FROM nodes ORDER BY created, id"):
+            self.node_ids.intern(node_id)
+        for from_id, to_id, rel_type in self.conn.execute(
+                "SELECT from_id, to_id, rel_type FROM relationships"):
+            self.node_ids.intern(from_id)
+            self.node_ids.intern(to_id)
+            self.rel_types.intern(rel_type)
+        self._count = self.conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0]
+
+    def _view(self, row: Tuple) -> SqliteRelationshipView:
+        record = dict(zip(RELATIONSHIP_COLUMNS, row))
+        record["bidirectional"] = bool(record["bidirectional"])
+        record["metadata"] = None if record["metadata"] is None else json.loads(record["metadata"])
+        return SqliteRelationshipView(self, record)
+
+    def _select(self, where: str = "", params: Tuple = ()) -> List[SqliteRelationshipView]:
+        rows = self.conn.execute(f"SELECT {', '.join(RELATIONSHIP_COLUMNS)} FROM relationships "
+                                 f"{where}", params).fetchall()
+        return [self._view(row) for row in rows]
+
+    def _pages(self, rel_type: str = None) -> Iterator[List[SqliteRelationshipView]]:
+        # Keyset pagination in key order: callers may add/remove edges between pages
+        prefix = () if rel_type is None else (rel_type,)
+        first = "" if rel_type is None else "WHERE rel_type = ?"
+        after = ("WHERE " if rel_type is None else "WHERE rel_type = ? AND ") + \
+            "(from_id, to_id, rel_type) > (?, ?, ?)"
+        order = " ORDER BY from_id, to_id, rel_type LIMIT ?"
+        page = self._select(first + order, prefix + (READ_PAGE_ROWS,))
+        while page:
+            yield page
+            last = page[-1]
+            page = self._select(after + order,
+                                prefix + (last.from_id, last.to_id, last.rel_type, READ_PAGE_ROWS))
+
+    def track_changes(self):
+        """Edits are written as they happen: nothing to track"""
+
+    def drain_changes(self) -> Tuple[List, List[Tuple[str, str, str]]]:
+        return [], []
+
+    def key_code(self, rel) -> int:
+        """Packed (from, to, type) code of an edge (any object with from_id/to_id/rel_type)"""
+        return RelationshipStore._pack(self.node_ids.intern(rel.from_id),
+                                       self.node_ids.intern(rel.to_id),
+                                       self.rel_types.intern(rel.rel_type))
+
+    def unpack_key(self, code: int) -> Tuple[str, str, str]:
+        return self.node_ids[code >> 48], self.node_ids[(code >> 16) & 0xFFFFFFFF], \
+            self.rel_types[code & 0xFFFF]
+
+    def has_key_code(self, code: int) -> bool:
+        return self.unpack_key(code) in self
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[SqliteRelationshipView]:
+        for page in self._pages():
+            yield from page
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM relationships WHERE from_id = ? AND to_id = ? AND rel_type = ?",
+            tuple(key)).fetchone() is not None
+
+    def get(self, from_id: str, to_id: str, rel_type: str) -> Optional[SqliteRelationshipView]:
+        found = self._select("WHERE from_id = ? AND to_id = ? AND rel_type = ?",
+                             (from_id, to_id, rel_type))
+        return found[0] if found else None
+
+    def add(self, rel) -> SqliteRelationshipView:
+        """Insert a relationship that is not already stored"""
+        self.key_code(rel)  # interns its ids
+        row = _relationship_row(rel)
+        self.conn.execute(UPSERT_RELATIONSHIP, row)
+        self._count += 1
+        return self._view(row)
+
+    def remove(self, from_id: str, to_id: str, rel_type: str) -> Optional[Dict]:
+        """Drop a relationship; returns its final field values"""
+        rel = self.get(from_id, to_id, rel_type)
+        if rel is None:
+            return None
+        self.conn.execute("DELETE FROM relationships WHERE from_id = ? AND to_id = ? AND rel_type = ?",
+                          (from_id, to_id, rel_type))
+        self._count -= 1
+        return rel.to_dict()
+
+    def outgoing(self, node_id: str, rel_type: str = None) -> List[SqliteRelationshipView]:
+        """Edges leaving node_id, optionally filtered by type"""
+        if rel_type is None:
+            return self._select("WHERE from_id = ?", (node_id,))
+        return self._select("WHERE from_id = ? AND rel_type = ?", (node_id, rel_type))
+
+    def incoming(self, node_id: str, rel_type: str = None) -> List[SqliteRelationshipView]:
+        """Edges arriving at node_id, optionally filtered by type"""
+        if rel_type is None:
+            return self._select("WHERE to_id = ?", (node_id,))
+        return self._select("WHERE to_id = ? AND rel_type = ?", (node_id, rel_type))
+
+    def of_type(self, rel_type: str) -> Iterator[SqliteRelationshipView]:
+        """Edges of one type, fetched a page at a time"""
+        for page in self._pages(rel_type):
+            yield from page
+
+    def type_counts(self) -> Dict[str, int]:
+        counts = dict(self.conn.execute("SELECT rel_type, COUNT(*) FROM relationships GROUP BY rel_type"))
+        return {rel_type: counts[rel_type] for rel_type in self.rel_types.ids if rel_type in counts}
+
+    def edge_columns(self, at: float = None):
+        """
+        Same as RelationshipStore.edge_columns, streamed from the table in key
+        order into typed arrays (edge numbers are row positions in that order).
+        """
+        import numpy as np
+        from_codes, to_codes, type_codes = array('q'), array('q'), array('i')
+        strengths, last_reinforced = array('d'), array('d')
+        node_code, type_code = self.node_ids.intern, self.rel_types.intern
+        cursor = self.conn.execute("SELECT from_id, to_id, rel_type, strength, last_reinforced "
+                                   "FROM relationships ORDER BY from_id, to_id, rel_type")
+        for from_id, to_id, rel_type, strength, reinforced in cursor:
+            from_codes.append(node_code(from_id))
+            to_codes.append(node_code(to_id))
+            type_codes.append(type_code(rel_type))
+            strengths.append(strength)
+            last_reinforced.append(reinforced)
+
+        def column(values: array, dtype) -> "np.ndarray":
+            return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype=dtype)
+
+        types = column(type_codes, np.int32)
+        weights = column(strengths, np.float64)
+        if at is not None and self.decay is not None and len(types):
+            rates = np.array([self.decay.rate(t) for t in self.rel_types.ids], dtype=np.float64)
+            elapsed = at - column(last_reinforced, np.float64)
+            weights = weights * np.exp(-rates[types] * np.maximum(elapsed, 0.0))
+        return (np.arange(len(types)), column(from_codes, np.int64), column(to_codes, np.int64),
+                types, weights)
+
+    def materialise_strengths(self, at: float = None):
+        """(edge numbers, effective strengths at time `at`) for every edge, in iteration order"""
+        edges, _, _, _, strengths = self.edge_columns(time.time() if at is None else at)
+        return edges, strengths
+
+    def prune(self, floor: float, at: float = None, rel_types: List[str] = None) -> List[Dict]:
+        """Remove edges whose effective strength at `at` is below floor; returns the removed records"""
+        import numpy as np
+        _, from_codes, to_codes, type_codes, strengths = \
+            self.edge_columns(time.time() if at is None else at)
+        weak = strengths < floor
+        if rel_types is not None:
+            codes = [c for c in (self.rel_types.lookup(t) for t in rel_types) if c is not None]
+            weak &= np.isin(type_codes, codes)
+        keys = [(self.node_ids[f], self.node_ids[t], self.rel_types[r]) for f, t, r in
+                zip(from_codes[weak].tolist(), to_codes[weak].tolist(), type_codes[weak].tolist())]
+        return [self.remove(*key) for key in keys]
+
+    def compact_if_sparse(self, max_dead_ratio: float = None) -> bool:
+        """Removals delete rows, so there are no tombstones to reclaim"""
+        return False
+
+    def compact(self):
+        pass
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Log Journal
+Append-only on-disk buffer of log entries, kept while Convex is unreachable
+and replayed in order once it is back
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SEGMENT_ENTRIES = 10000
+MAX_SEGMENTS = 1000
+CURSOR_FILE = "cursor.json"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class LogJournal:
+    """
+    A directory of numbered JSON-lines segment files plus a cursor (segment,
+    byte offset) marking what has been replayed. append() writes a whole
+    batch and fsyncs once; read() returns the oldest pending entries and
+    commit() moves the cursor past them, deleting finished segments.
+    Only the open tail segment's file handle is kept, so memory does not
+    grow with the length of an outage.
+    """
+
+    def __init__(self, directory: Path, segment_entries: int = SEGMENT_ENTRIES,
+                 max_segments: Optional[int] = MAX_SEGMENTS, fsync: bool = True):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_entries = segment_entries
+        # Oldest segments are discarded beyond this many (None = unbounded disk use)
+        self.max_segments = max_segments
+        self.fsync = fsync
+        self.dropped = 0
+
+        self._segments: List[int] = []
+        self._offset = 0                # byte offset of the next unread entry in _segments[0]
+        self._pending = 0
+        self._tail = None               # open handle of the segment being appended to
+        self._tail_entries = 0
+        self._read_pos = None           # (segment, offset, entries) after the last read()
+        self._load()
+
+    def _path(self, segment: int) -> Path:
+        return self.dir / f"{segment:010d}{SEGMENT_SUFFIX}"
+
+    def _load(self):
+        cursor = {"segment": 0, "offset": 0}
+        try:
+            with open(self.dir / CURSOR_FILE, 'r') as f:
+                cursor = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable log journal cursor {self.dir}: {e}")
+
+        segments = sorted(int(p.stem) for p in self.dir.glob(f"*{SEGMENT_SUFFIX}") if p.stem.isdigit())
+        for segment in segments:
+            if segment < cursor["segment"]:
+                self._path(segment).unlink()  # replayed before the last shutdown
+        self._segments = [s for s in segments if s >= cursor["segment"]]
+        if self._segments and self._segments[0] == cursor["segment"]:
+            self._offset = cursor["offset"]
+        self._next_segment = max([cursor["segment"]] + [s + 1 for s in self._segments])
+        self._pending = sum(self._count_lines(s, self._offset if i == 0 else 0)
+                            for i, s in enumerate(self._segments))
+
+    def _count_lines(self, segment: int, offset: int) -> int:
+        """Complete lines from offset on (a torn last line from a crash is not counted)"""
+        count = 0
+        with open(self._path(segment), 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if line.endswith(b"\n"):
+                    count += 1
+        return count
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def pending(self) -> bool:
+        return self._pending > 0
+
+    def append(self, entries: List[Dict]):
+        """Write entries to the tail segment; one fsync for the whole batch"""
+        if not entries:
+            return
+        if self._tail is None:
+            # Appends always start a fresh segment, never extend one from an earlier run
+            segment = self._next_segment
+            self._next_segment += 1
+            self._segments.append(segment)
+            self._tail = open(self._path(segment), 'ab')
+            self._tail_entries = 0
+        self._tail.write(b"".join(json.dumps(entry).encode() + b"\n" for entry in entries))
+        self._tail.flush()
+        if self.fsync:
+            os.fsync(self._tail.fileno())
+        self._pending += len(entries)
+        self._tail_entries += len(entries)
+
+        if self._tail_entries >= self.segment_entries:
+            self._tail.close()
+            self._tail = None
+            if self.max_segments is not None:
+                while len(self._segments) > self.max_segments:
+                    self._drop_head()
+
+    def _drop_head(self):
+        segment = self._segments.pop(0)
+        lost = self._count_lines(segment, self._offset)
+        self._path(segment).unlink()
+        self._offset = 0
+        self._pending -= lost
+        self.dropped += lost
+        self._read_pos = None
+        self._write_cursor()
+        print(f"⚠️ Log journal full, discarded {lost} oldest entries")
+
+    def read(self, max_entries: int) -> List[Dict]:
+        """Up to max_entries of the oldest pending entries; commit() once they are delivered"""
+        entries = []
+        consumed = 0
+        index, offset = 0, self._offset
+        while len(entries) < max_entries and index < len(self._segments):
+            segment = self._segments[index]
+            with open(self._path(segment), 'rb') as f:
+                f.seek(offset)
+                while len(entries) < max_entries:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break  # end of segment, or a torn write from a crash
+                    offset = f.tell()
+                    consumed += 1
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        pass
+            if len(entries) < max_entries and index + 1 < len(self._segments):
+                index, offset = index + 1, 0
+            else:
+                break
+        self._read_pos = (self._segments[index], offset, consumed) if self._segments else None
+        return entries
+
+    def commit(self):
+        """Mark the entries returned by the last read() as delivered"""
+        if self._read_pos is None:
+            return
+        segment, offset, consumed = self._read_pos
+        self._read_pos = None
+        while self._segments and self._segments[0] != segment:
+            self._path(self._segments.pop(0)).unlink()
+        self._offset = offset
+        # Delivered segments are deleted before pending() can report empty
+        # (the shipper thread commits while other threads poll it)
+        if self._pending - consumed <= 0:
+            if self._tail is not None:
+                self._tail.close()
+                self._tail = None
+            for segment in self._segments:
+                self._path(segment).unlink()
+            self._segments = []
+            self._offset = 0
+        self._pending = max(0, self._pending - consumed)
+        self._write_cursor()
+
+    def _write_cursor(self):
+        # Not fsynced: losing the latest cursor only replays entries the
+        # server already has, and their idempotency keys make that a no-op
+        segment = self._segments[0] if self._segments else self._next_segment
+        tmp = self.dir / (CURSOR_FILE + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"segment": segment, "offset": self._offset}, f)
+        os.replace(tmp, self.dir / CURSOR_FILE)
+
+    def close(self):
+        if self._tail is not None:
+            self._tail.close()
+            self._tail = None
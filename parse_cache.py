@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Parse Cache
+Content-addressed store of parsed documents, keyed by a hash of the raw file bytes
+
+Layout (in cache_dir/<2-char prefix>/):
+    <digest>.txt.gz   extracted text, gzip-compressed
+    <digest>.json     page count, text stats and concepts (per vocabulary)
+"""
+
+import os
+import gzip
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+READ_BLOCK = 1 << 20
+TEXT_BLOCK_CHARS = 1 << 20
+
+
+def file_digest(filepath: Path) -> str:
+    """BLAKE2b of the raw file bytes, read in blocks (never the whole file at once)"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(filepath, 'rb') as f:
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """Parsed text and extraction results shared by every file with the same bytes"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, digest: str, suffix: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}{suffix}"
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Cached record for a file digest, or None"""
+        path = self._path(digest, ".json")
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable parse cache entry {path.name}: {e}")
+            return None
+
+    def put(self, digest: str, record: Dict):
+        path = self._path(digest, ".json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def has_text(self, digest: str) -> bool:
+        return self._path(digest, ".txt.gz").exists()
+
+    def iter_text(self, digest: str) -> Iterator[str]:
+        """Stream the cached text back in blocks"""
+        # newline="": return the text exactly as cached ("\r\n" and "\r" included)
+        with gzip.open(self._path(digest, ".txt.gz"), 'rt', encoding='utf-8', newline='') as f:
+            while True:
+                block = f.read(TEXT_BLOCK_CHARS)
+                if not block:
+                    return
+                yield block
+
+    def tee_text(self, digest: str, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Pass chunks through while compressing them into the cache. The entry
+        only appears once the stream is fully consumed.
+        """
+        path = self._path(digest, ".txt.gz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='', compresslevel=6) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
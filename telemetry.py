@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Telemetry
+Opt-in OpenTelemetry tracing. Off by default: spans are plain function calls
+and OpenTelemetry is never imported. Enable with HUGH_OTLP_ENDPOINT or
+configure(endpoint); the exporter is set up on the first traced call.
+"""
+
+import os
+import functools
+from typing import Callable, Optional
+
+SERVICE_NAME = "hugh-knowledge-graph-builder"
+ENDPOINT_ENV = "HUGH_OTLP_ENDPOINT"
+DEFAULT_ENDPOINT = "http://localhost:4318/v1/traces"
+
+_endpoint: Optional[str] = os.environ.get(ENDPOINT_ENV) or None
+_tracer = None
+
+
+def configure(endpoint: Optional[str]):
+    """Send spans to an OTLP/HTTP endpoint from the next traced call on (None = off)"""
+    global _endpoint, _tracer
+    _endpoint = endpoint or None
+    _tracer = None
+
+
+def endpoint() -> Optional[str]:
+    return _endpoint
+
+
+def get_tracer():
+    """The OpenTelemetry tracer, created on first use; None while tracing is off"""
+    global _tracer
+    if _endpoint is None:
+        return None
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError as e:
+            print(f"Tracing disabled, OpenTelemetry not installed: {e}")
+            configure(None)
+            return None
+        provider = TracerProvider(resource=Resource(attributes={"service.name": SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=_endpoint)))
+        trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer(__name__)
+    return _tracer
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run the function inside a span named `name` when tracing is on"""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer() if _endpoint is not None else None
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with tracer.start_as_current_span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,158 @@
+"""
+LogJournal / LogShipper against a stub Convex client: outage -> journal ->
+in-order replay, idempotency keys, segment cleanup and replay after restart
+"""
+
+import time
+import threading
+
+import pytest
+
+import convex_logger
+from convex_logger import LogShipper
+from log_journal import LogJournal, SEGMENT_SUFFIX
+
+
+class StubClient:
+    """Stands in for ConvexClient; logs:logBatch skips keys it already stored"""
+
+    def __init__(self, up=True):
+        self.up = up
+        self.entries = []
+        self.calls = 0
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def mutation(self, name, args):
+        assert name == "logs:logBatch"
+        with self._lock:
+            self.calls += 1
+            if not self.up:
+                raise ConnectionError("Convex unreachable")
+            for entry in args["entries"]:
+                if entry["key"] not in self._keys:
+                    self._keys.add(entry["key"])
+                    self.entries.append(entry)
+
+    def keys(self):
+        with self._lock:
+            return [entry["key"] for entry in self.entries]
+
+
+def make_entries(start, count):
+    return [{"key": f"k{i:05d}", "level": "INFO", "message": f"line {i}"}
+            for i in range(start, start + count)]
+
+
+def segments(directory):
+    return sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(autouse=True)
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(convex_logger, "RETRY_INTERVAL", 0.02)
+    monkeypatch.setattr(convex_logger, "MAX_RETRY_INTERVAL", 0.05)
+
+
+def test_journal_reads_in_order_and_deletes_replayed_segments(tmp_path):
+    journal = LogJournal(tmp_path, segment_entries=10, fsync=False)
+    for start in (0, 10, 20):
+        journal.append(make_entries(start, 10 if start < 20 else 5))
+    assert len(journal) == 25
+    assert len(segments(tmp_path)) == 3
+
+    first = journal.read(12)
+    assert [e["key"] for e in first] == [f"k{i:05d}" for i in range(12)]
+    journal.commit()
+    assert len(journal) == 13
+    assert len(segments(tmp_path)) == 2  # the first segment was fully replayed
+
+    rest = journal.read(100)
+    assert [e["key"] for e in rest] == [f"k{i:05d}" for i in range(12, 25)]
+    journal.commit()
+    assert not journal.pending()
+    assert segments(tmp_path) == []
+    journal.close()
+
+
+def test_journal_resumes_from_cursor_after_restart(tmp_path):
+    journal = LogJournal(tmp_path, segment_entries=10, fsync=False)
+    journal.append(make_entries(0, 15))
+    journal.read(7)
+    journal.commit()
+    journal.close()
+
+    reopened = LogJournal(tmp_path, segment_entries=10, fsync=False)
+    assert len(reopened) == 8
+    assert [e["key"] for e in reopened.read(100)] == [f"k{i:05d}" for i in range(7, 15)]
+    reopened.close()
+
+
+def test_journal_ignores_torn_last_line(tmp_path):
+    journal = LogJournal(tmp_path, fsync=False)
+    journal.append(make_entries(0, 3))
+    journal.close()
+    with open(segments(tmp_path)[-1], 'ab') as f:
+        f.write(b'{"key": "k99999", "mess')  # crash mid-write
+
+    reopened = LogJournal(tmp_path, fsync=False)
+    assert len(reopened) == 3
+    assert [e["key"] for e in reopened.read(100)] == ["k00000", "k00001", "k00002"]
+    reopened.close()
+
+
+def test_outage_is_journaled_and_replayed_in_order(tmp_path):
+    client = StubClient(up=False)
+    journal = LogJournal(tmp_path, segment_entries=10, fsync=False)
+    shipper = LogShipper(client, batch_size=5, flush_interval=0.01, journal=journal,
+                         replay_rate=100000)
+    for entry in make_entries(0, 20):
+        shipper.submit(entry)
+    assert shipper.flush(timeout=5)
+    assert client.entries == []
+    assert shipper.spilled == 20
+    assert segments(tmp_path)
+
+    # Entries logged while the journal is non-empty queue behind it
+    client.up = True
+    for entry in make_entries(20, 10):
+        shipper.submit(entry)
+    assert wait_for(lambda: len(client.entries) == 30)
+    assert client.keys() == [f"k{i:05d}" for i in range(30)]
+    assert wait_for(lambda: not journal.pending())
+    assert segments(tmp_path) == []
+    shipper.close()
+
+
+def test_restart_replays_journal_without_duplicates(tmp_path):
+    client = StubClient(up=False)
+    shipper = LogShipper(client, batch_size=5, flush_interval=0.01,
+                         journal=LogJournal(tmp_path, fsync=False), replay_rate=100000)
+    for entry in make_entries(0, 12):
+        shipper.submit(entry)
+    assert shipper.flush(timeout=5)
+    shipper.close()
+
+    # A batch reached Convex but the process died before the cursor moved
+    journal = LogJournal(tmp_path, fsync=False)
+    client.up = True
+    client.mutation("logs:logBatch", {"entries": journal.read(5)})
+    journal.close()
+
+    journal = LogJournal(tmp_path, fsync=False)
+    assert len(journal) == 12
+    shipper = LogShipper(client, batch_size=5, flush_interval=0.01, journal=journal,
+                         replay_rate=100000)
+    assert wait_for(lambda: not journal.pending())
+    assert client.keys() == [f"k{i:05d}" for i in range(12)]
+    assert segments(tmp_path) == []
+    shipper.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+H.U.G.H. Vector Index
+Nearest-neighbour search over concept embeddings (cosine similarity)
+"""
+
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+Vector = Union[Sequence[float], np.ndarray]
+Hit = Tuple[str, float]
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class ExactBackend:
+    """Brute force: one matrix-vector product per query"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.vectors @ query
+        rows = _top_k(scores, k)
+        return rows, scores[rows]
+
+
+class IVFBackend:
+    """
+    Inverted-file index: k-means coarse quantiser, then exact scoring inside
+    the n_probe closest lists. Approximate, but sublinear in N.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_lists: int = None, n_probe: int = 8,
+                 iterations: int = 10, seed: int = 0):
+        self.vectors = vectors
+        n = len(vectors)
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        self.n_probe = max(1, min(self.n_lists, n_probe))
+
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, self.n_lists, replace=False)] if n else \
+            np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        assignment = np.zeros(n, dtype=np.int64)
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            counts = np.bincount(assignment, minlength=len(centroids))
+            filled = counts > 0
+            # Empty lists keep their previous centroid
+            centroids[filled] = _normalise(sums[filled])
+        self.centroids = centroids
+
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(self.n_lists)]
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        probe = _top_k(self.centroids @ query, self.n_probe)
+        candidates = np.concatenate([self.lists[i] for i in probe])
+        scores = self.vectors[candidates] @ query
+        best = _top_k(scores, k)
+        return candidates[best], scores[best]
+
+
+class VectorIndex:
+    """
+    In-process similarity index over node embeddings.
+    backend="exact" (NumPy brute force) or "ivf" (approximate).
+    """
+
+    BACKENDS = {"exact": ExactBackend, "ivf": IVFBackend}
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, backend: str = "exact",
+                 encoder: Callable[[str], Vector] = None, normalised: bool = False,
+                 **backend_options):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown vector index backend: {backend}")
+        self.ids = list(ids)
+        self.rows = {node_id: row for row, node_id in enumerate(self.ids)}
+        # normalised=True: rows are already unit length (e.g. a memory-mapped
+        # matrix), so they are used in place instead of copied
+        self.vectors = vectors if normalised else _normalise(np.asarray(vectors, dtype=np.float32))
+        self.backend = self.BACKENDS[backend](self.vectors, **backend_options)
+        self.encoder = encoder
+
+    @classmethod
+    def from_builder(cls, builder, backend: str = "exact",
+                     encoder: Callable[[str], Vector] = None, **backend_options) -> "VectorIndex":
+        """Index the concept embeddings produced by builder.generate_embeddings()"""
+        if builder.embedding_matrix is None:
+            raise ValueError("Builder has no embeddings; run generate_embeddings() first")
+        ids = [None] * len(builder.embedding_rows)
+        for node_id, row in builder.embedding_rows.items():
+            ids[row] = node_id
+        return cls(ids, builder.embedding_matrix, backend=backend, encoder=encoder,
+                   **backend_options)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _query_vector(self, text_or_vector: Union[str, Vector]) -> np.ndarray:
+        if isinstance(text_or_vector, str):
+            if self.encoder is None:
+                self.encoder = _sentence_encoder()
+            text_or_vector = self.encoder(text_or_vector)
+        return _normalise(np.asarray(text_or_vector, dtype=np.float32).reshape(-1))
+
+    def nearest(self, text_or_vector: Union[str, Vector], k: int = 10,
+                candidates: Iterable[str] = None) -> List[Hit]:
+        """
+        k most similar nodes to a text or vector, as (node_id, cosine similarity).
+        With candidates, only those node ids are scored (exactly).
+        """
+        if not self.ids or k <= 0:
+            return []
+        query = self._query_vector(text_or_vector)
+        if candidates is None:
+            rows, scores = self.backend.search(query, k)
+        else:
+            subset = np.array(sorted({self.rows[c] for c in candidates if c in self.rows}),
+                              dtype=np.int64)
+            if not len(subset):
+                return []
+            scores = self.vectors[subset] @ query
+            best = _top_k(scores, k)
+            rows, scores = subset[best], scores[best]
+        return [(self.ids[r], float(s)) for r, s in zip(rows, scores)]
+
+    def similar_concepts(self, node_id: str, k: int = 10) -> List[Hit]:
+        """k nodes most similar to an indexed node, excluding the node itself"""
+        row = self.rows.get(node_id)
+        if row is None:
+            raise KeyError(node_id)
+        hits = self.nearest(self.vectors[row], k + 1)
+        return [(other, score) for other, score in hits if other != node_id][:k]
+
+    def knn_pairs(self, k: int, threshold: float) -> List[Tuple[str, str, float]]:
+        """
+        Unordered (a, b, similarity) pairs of mutual neighbours: b is among a's
+        k nearest above threshold and a among b's. Pairs are ordered by row.
+        """
+        neighbours = {}
+        for node_id in self.ids:
+            neighbours[node_id] = {}
+            for other, score in self.similar_concepts(node_id, k):
+                if score < threshold:
+                    break
+                neighbours[node_id][other] = score
+        pairs = []
+        for node_id, hits in neighbours.items():
+            for other, score in hits.items():
+                if self.rows[node_id] < self.rows[other] and node_id in neighbours[other]:
+                    pairs.append((node_id, other, score))
+        return pairs
+
+
+def _sentence_encoder(model_name: Optional[str] = None) -> Callable[[str], np.ndarray]:
+    """Lazily load the sentence-transformers model used for text queries"""
+    from sentence_transformers import SentenceTransformer
+    from build_knowledge_graph import EMBEDDING_MODEL
+    model = SentenceTransformer(model_name or EMBEDDING_MODEL)
+    return lambda text: model.encode(text, convert_to_numpy=True)